@@ -1,7 +1,18 @@
 import streamlit as st  # web development
 import datetime
-from subs.data_loader import load_data, process_data_for_analysis , process_uploaded_file, convert_time , process_time_resolution_and_duplicates , display_column_statistics
-from subs.visualisation import visualize_missing_values , visualize_data_by_date_range , visualise_time_series_data
+import uuid
+from subs.data_loader import load_data, load_data_streaming, load_excel_streaming, list_excel_sheets, read_excel_header, read_header, processed_to_bytes, process_data_for_analysis , process_uploaded_file, convert_time , MISSING_VALUE_OPTIONS
+from subs.visualisation import visualize_missing_values , visualize_data_by_date_range , visualise_time_series_data, visualise_forecast_errors, display_paginated_table, display_column_statistics
+from subs.decimation import DEFAULT_MAX_POINTS
+from subs.aggregation import compute_trend_aggregates
+from subs.rollup import build_rollups
+from subs.forecast_errors import compute_forecast_errors
+from subs.cache import frame_cache, content_hash, make_key
+from subs.store import TimeSeriesStore
+from subs.compact import process_time_resolution_compact
+from subs.merge import merge_exports
+from subs.jobs import job_manager
+from subs import profiling
 
 st.set_page_config(
     page_title="Empowering Insights",
@@ -54,6 +65,44 @@ def page0():
 
     )
     
+# How often a page waiting for a background job refreshes its progress bar (in seconds)
+JOB_POLL_SECONDS = 0.25
+
+
+def run_stage(key, func, *args):
+    """
+    Returns the result of a pipeline stage from the shared cache, computing it as a background job on a miss.
+
+    While the job runs, the page shows its stage and progress. Changing a widget reruns the page
+    straight away: the job carries on if the new run needs the same result, and is cancelled if
+    the new inputs no longer need it.
+    """
+    if key in frame_cache:
+        return frame_cache.get_or_compute(key, func, *args)
+
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    job = job_manager.submit(key, func, *args, owner=session_id, track_memory=profiling.tracks_memory())
+    # Any other job of this session was started for inputs that have changed since
+    job_manager.release(session_id, keep=job)
+
+    progress_bar = st.progress(0.0, text=job.describe())
+    while not job.wait(JOB_POLL_SECONDS):
+        # Each update also lets Streamlit stop this run as soon as a widget changes
+        progress_bar.progress(job.progress, text=job.describe())
+    progress_bar.empty()
+    # The job's stages ran in a worker thread; show them in this run's performance panel
+    profiling.add_run_records(job.records)
+
+    if job.status == "failed":
+        raise job.error
+    if job.status == "cancelled":
+        st.stop()
+    sentinel = object()
+    result = frame_cache.get(key, sentinel)
+    # Results larger than the whole cache are not kept there
+    return job.result if result is sentinel else result
+
+
 # Define your pages
 def page1():
     st.markdown("# Data Manipulation")
@@ -65,23 +114,77 @@ def page1():
 
     st.markdown("### 🔗 Upload your data")
 
-    # Create a file uploader
-    uploaded_file = st.file_uploader("Upload your CSV file")
+    # Create a file uploader; several exports (consecutive years, other areas) are merged into one
+    uploaded_files = st.file_uploader("Upload your CSV file(s)", accept_multiple_files=True)
+    uploaded_file = uploaded_files[0] if uploaded_files else None
 
 
     # Check if a file has been uploaded
     if uploaded_file:
-        df_read = load_data(uploaded_file)
-        st.dataframe(df_read)
-
-        # Show the clients the list of their DataFrame columns and ask them to 
-        # choose the column with date and time observations
-        time_column = st.selectbox(
-            "Please select the column with date and time observations:", df_read.columns
+        # Every stage is cached on the upload's content hash plus its own parameters,
+        # so reruns only recompute the stages whose inputs actually changed
+        file_key = make_key("files", *sorted(content_hash(file) for file in uploaded_files))
+
+        # Large CSV and Excel exports can be streamed in chunks into a compact float32 buffer
+        excel_upload = uploaded_file.name.endswith(".xlsx")
+        streaming_ingest = len(uploaded_files) == 1 and (uploaded_file.name.endswith(".csv") or excel_upload) and st.checkbox(
+            "Low-memory streaming ingest (recommended for multi-year exports and Excel files)"
         )
 
-        # process data for further analysis 
-        df_read , skip_invalid_row , first_invalid_row_time= process_data_for_analysis(df_read,time_column)
+        if len(uploaded_files) > 1:
+            # The exports are parsed in parallel and aligned on one UTC time index
+            analysis_key = make_key("merge", file_key)
+            df_read = run_stage(analysis_key, merge_exports, uploaded_files)
+            time_column = df_read.columns[0]
+            # Rows from the first "-" onwards were already dropped per file while merging
+            skip_invalid_row, first_invalid_row_time = "True", None
+            display_paginated_table(df_read, "merged_table")
+        elif streaming_ingest and excel_upload:
+            # Only the chosen sheet and columns are read; the parsed sheet is kept as an Arrow file
+            sheet_name = st.selectbox("Please select the sheet:", list_excel_sheets(uploaded_file))
+            excel_columns = read_excel_header(uploaded_file, sheet_name)
+            time_column = st.selectbox("Please select the column with date and time observations:", excel_columns)
+            value_columns = st.multiselect(
+                "Columns to load:", [column for column in excel_columns if column != time_column],
+                default=[column for column in excel_columns if column != time_column],
+            )
+
+            analysis_key = make_key("excel", file_key, sheet_name, time_column, value_columns)
+            df_read , skip_invalid_row , first_invalid_row_time= run_stage(
+                analysis_key, load_excel_streaming, uploaded_file, sheet_name, time_column, value_columns
+            )
+            display_paginated_table(df_read, "excel_table")
+        elif streaming_ingest:
+            time_column = st.selectbox(
+                "Please select the column with date and time observations:", read_header(uploaded_file)
+            )
+
+            # The streaming loader parses times and flags invalid rows while it reads
+            analysis_key = make_key("stream", file_key, time_column)
+            df_read , skip_invalid_row , first_invalid_row_time= run_stage(
+                analysis_key, load_data_streaming, uploaded_file, time_column
+            )
+            display_paginated_table(df_read, "stream_table")
+        else:
+            load_key = make_key("load", file_key)
+            df_read = run_stage(load_key, load_data, uploaded_file)
+            display_paginated_table(df_read, "raw_table")
+
+            # Show the clients the list of their DataFrame columns and ask them to 
+            # choose the column with date and time observations
+            time_column = st.selectbox(
+                "Please select the column with date and time observations:", df_read.columns
+            )
+
+            # process data for further analysis 
+            analysis_key = make_key("analysis", load_key, time_column)
+            df_read , skip_invalid_row , first_invalid_row_time= run_stage(
+                analysis_key, process_data_for_analysis, df_read, time_column
+            )
+
+        # Parse the time column up front so the time-aware cleaning options can use it
+        time_key = make_key("time", analysis_key, time_column)
+        df_read = run_stage(time_key, convert_time, df_read, time_column)
 
         # Visualise missing data
         visualize_missing_values(df_read)
@@ -89,13 +192,30 @@ def page1():
 
     st.markdown("### ⚙️ Dealing with Missing Values")
     st.markdown("📝 Please choose how you want to deal with missing values?")
-    options_to_drop = ["Remove", "Interpolate", "Backward/Forward Filling"]
     # users can define the method by which they prefer to deal with missing values
-    selected_option_missing_values = st.selectbox("Select the Job", options_to_drop)
+    selected_option_missing_values = st.selectbox("Select the Job", MISSING_VALUE_OPTIONS)
+    max_gap = st.number_input(
+        "Maximum gap to fill, in consecutive rows (0 fills gaps of any length):", min_value=0, value=0
+    )
 
     if uploaded_file is not None:
-        df_read = process_uploaded_file (df_read,selected_option_missing_values)
-        st.dataframe(df_read)
+        clean_key = make_key("clean", time_key, selected_option_missing_values, max_gap)
+        df_read, fill_report = run_stage(
+            clean_key, process_uploaded_file, df_read, selected_option_missing_values, max_gap or None
+        )
+        display_paginated_table(df_read, "cleaned_table")
+        st.dataframe(fill_report)
+        if df_read.empty:
+            # e.g. 'Remove' on merged exports whose areas or years do not overlap
+            st.warning("No rows are left after dealing with missing values; please choose another method.")
+            return
+
+        # Hourly, daily, weekly and monthly rollups of the cleaned data, built once at ingest, so
+        # whole-hour resolutions below are read from them instead of resampling every row again
+        rollups = run_stage(
+            make_key("rollups", clean_key, skip_invalid_row, first_invalid_row_time),
+            build_rollups, df_read, time_column, skip_invalid_row, first_invalid_row_time
+        )
 
     st.markdown("### ⏲️ Time Resolution Adjustment")
 
@@ -108,26 +228,74 @@ def page1():
             "Please select the unit of your preferred time resolution:",
             ["minutes", "hours"],
         )
+        # Downsampling combines all observations in each new interval
+        aggregation_method = st.selectbox(
+            "When lowering the resolution, combine values with (mean for MW, sum for MWh):",
+            ["mean", "sum", "min", "max"],
+        )
 
         # Apply the function to your DataFrame
-        df_read = convert_time(df_read, time_column)
+        resolution_key = make_key(
+            "resolution", clean_key, time_resolution_number, time_resolution_unit, skip_invalid_row,
+            first_invalid_row_time, aggregation_method
+        )
+        # The stage caches one compact copy of the processed data, shared by every session with the
+        # same data; the table, the export and the store below are built from it
+        df_compact = run_stage(
+            resolution_key, process_time_resolution_compact, df_read, time_column,
+            time_resolution_number, time_resolution_unit, skip_invalid_row, first_invalid_row_time, aggregation_method,
+            rollups
+        )
+        df_read = df_compact.to_frame()
+
+        display_paginated_table(df_read, "processed_table")
+        # Other pages read the processed data from the compact copy rather than from a DataFrame
+        # held in each session's state
+        st.session_state['df_compact'] = df_compact
+        st.session_state['df_key'] = resolution_key  # Identifies the processed data in the shared cache
+
+        # Offer the processed data as a columnar file that can be uploaded again without re-parsing
+        export_metadata = {
+            "source_file": ", ".join(file.name for file in uploaded_files),
+            "missing_values": selected_option_missing_values,
+            "max_gap": max_gap or None,
+            "resolution": f"{time_resolution_number} {time_resolution_unit}",
+            "aggregation": aggregation_method,
+        }
+        processed_file = frame_cache.get_or_compute(
+            make_key("export", resolution_key, "parquet"), processed_to_bytes, df_read, "parquet", export_metadata
+        )
+        file_stem = uploaded_file.name.rsplit(".", 1)[0] if len(uploaded_files) == 1 else "merged"
+        st.download_button(
+            "📥 Download processed data (Parquet)", processed_file, file_name=f"{file_stem}_processed.parquet"
+        )
 
-        df_read = process_time_resolution_and_duplicates(df_read, time_column, time_resolution_number, time_resolution_unit, skip_invalid_row, first_invalid_row_time)
 
-        st.dataframe(df_read)
-        st.session_state['df_read'] = df_read  # Save processed DataFrame to session state for other pages
+    st.markdown("### 🎨 Visualising the Results")
 
+    store = None
+    if uploaded_file is not None:
+        # A sorted, read-only copy of the processed data, shared without copies across reruns
+        store = frame_cache.get_or_compute(make_key("store", resolution_key), TimeSeriesStore.from_frame, df_read)
+    date_range_section(store)
 
-    st.markdown("### 🎨 Visualising the Results")
+
+# Widgets inside a fragment only rerun the fragment, not the whole page with its processing chain
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
 
+@fragment
+def date_range_section(store):
     # Select a range of dates
     start_date = datetime.date(2023, 7, 6)
     end_date = datetime.date(2023, 7, 8)
     date_of_interest = st.date_input("Select a date range", [start_date, end_date])
 
-    if uploaded_file is not None:
-        visualize_data_by_date_range(df_read,date_of_interest)
+    # Long ranges are reduced to about the chart's width in points, keeping every peak
+    show_every_point = st.checkbox("Show every data point (slower for long date ranges)")
+
+    if store is not None and date_of_interest:
+        visualize_data_by_date_range(store, date_of_interest, max_points=None if show_every_point else DEFAULT_MAX_POINTS)
 
 
 def page2():
@@ -136,11 +304,22 @@ def page2():
     # if uploaded_file is not None:
 
        # Check if data has been uploaded and processed
-    if 'df_read' in st.session_state:
-        df_read = st.session_state['df_read']    
+    if 'df_compact' in st.session_state:
+        df_read = st.session_state['df_compact'].to_frame()
 
-        visualise_time_series_data(df_read)
-        display_column_statistics(df_read) 
+        # Daily/monthly aggregates and statistics are computed once per processed dataset
+        rollups = frame_cache.get_or_compute(make_key("rollups", st.session_state['df_key']), build_rollups, df_read)
+        aggregates = frame_cache.get_or_compute(
+            make_key("trend", st.session_state['df_key']), compute_trend_aggregates, df_read, rollups
+        )
+        visualise_time_series_data(df_read, aggregates)
+        display_column_statistics(df_read, aggregates["statistics"]) 
+
+        # Forecast accuracy of every forecast/actual pair, cached with the processed data too
+        forecast_errors = frame_cache.get_or_compute(
+            make_key("forecast_errors", st.session_state['df_key']), compute_forecast_errors, df_read
+        )
+        visualise_forecast_errors(df_read, forecast_errors)
     else:
         st.error("Please upload data on the Data Manipulation page first.")        
 
@@ -148,10 +327,29 @@ def page2():
 # Sidebar navigation
 st.sidebar.title('Navigation')
 page = st.sidebar.radio("Select a page:", ('Service Overview','Data Manipulation', 'Trend Analysis'))
+show_performance = st.sidebar.checkbox("Show performance panel")
+measure_memory = show_performance and st.sidebar.checkbox(
+    "Measure memory (slower)",
+    help="Peak memory is measured for the whole server process, so it includes other sessions' work running at the same time.",
+)
+
+# Collect per-stage timings for this rerun
+profiling.start_run(track_memory=measure_memory)
 
 if page == 'Data Manipulation':
     page1()
 elif page == 'Trend Analysis':
     page2()
 elif page == 'Service Overview':
-    page0()    
\ No newline at end of file
+    page0()
+
+if show_performance:
+    # Timings, rows and cache hits of every stage run during this rerun
+    st.sidebar.markdown("### ⏱️ Performance")
+    run_records = profiling.get_run_records()
+    if run_records.empty:
+        st.sidebar.write("No pipeline stages ran on this page.")
+    else:
+        st.sidebar.dataframe(run_records.drop(columns=["timestamp"]))
+    st.sidebar.markdown("Totals since the server started")
+    st.sidebar.dataframe(profiling.get_stage_totals())
@@ -0,0 +1,243 @@
+# run_benchmarks.py
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from subs.data_loader import (
+    load_data,
+    load_data_streaming,
+    load_excel_streaming,
+    process_data_for_analysis,
+    convert_time,
+    process_uploaded_file,
+    process_time_resolution_and_duplicates,
+)
+from subs.aggregation import compute_trend_aggregates
+from subs.visualisation import time_series_trace
+from benchmarks.synthetic import write_export
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(REPO_ROOT, "data-for-tests")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+# The 15-minute export synthetic data is scaled from
+TEMPLATE_FIXTURE = os.path.join(FIXTURE_DIR, "Total Load - Day Ahead _ Actual_202301010000-202401010000.csv")
+
+
+def _measure(func, make_args, repeat, track_memory):
+    # Time 'func' on fresh inputs; inputs are built outside the timed region
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = make_args()
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+
+    peak_bytes = None
+    if track_memory:
+        args = make_args()
+        tracemalloc.start()
+        func(*args)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, timings, peak_bytes
+
+
+def _rows(value):
+    if isinstance(value, tuple):
+        value = value[0]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(len(trace.x) for trace in value)
+    return None
+
+
+def benchmark_file(path, repeat=3, track_memory=True):
+    """
+    Times every stage of the ingest-to-chart pipeline on one export.
+
+    Each stage is run 'repeat' times on a fresh copy of the previous stage's output, plus once
+    more under tracemalloc to record its peak memory when 'track_memory' is set.
+
+    Args:
+        path: str
+            The export file to benchmark.
+        repeat: int
+            The number of timed runs per stage.
+        track_memory: bool
+            Whether to record the peak memory of each stage.
+
+    Returns:
+        list of dict: One record per stage with its timings, peak memory and rows in/out.
+    """
+    records = []
+
+    def run(stage, func, make_args, rows_in):
+        result, timings, peak_bytes = _measure(func, make_args, repeat, track_memory)
+        records.append({
+            "dataset": os.path.basename(path),
+            "stage": stage,
+            "seconds_min": min(timings),
+            "seconds_median": float(np.median(timings)),
+            "peak_bytes": peak_bytes,
+            "rows_in": rows_in,
+            "rows_out": _rows(result),
+        })
+        return result
+
+    with open(path, "rb") as export_file:
+        content = export_file.read()
+
+    def open_file():
+        # Mimic a Streamlit upload: an in-memory buffer with a file name
+        uploaded_file = io.BytesIO(content)
+        uploaded_file.name = os.path.basename(path)
+        return (uploaded_file,)
+
+    raw = run("load", load_data, open_file, None)
+    time_column = raw.columns[0]
+    if path.lower().endswith(".csv"):
+        run("load_streaming", load_data_streaming, lambda: (path,), None)
+    elif path.lower().endswith(".xlsx"):
+        # Without the file cache, so every run parses the workbook
+        run("load_streaming", lambda source: load_excel_streaming(source, cache_dir=None), lambda: (path,), None)
+
+    df_read, skip_invalid_row, first_invalid_row_time = run(
+        "analysis", process_data_for_analysis, lambda: (raw.copy(), time_column), len(raw)
+    )
+    converted = run("convert_time", convert_time, lambda: (df_read.copy(), time_column), len(df_read))
+    cleaned, _ = run("clean", process_uploaded_file, lambda: (converted.copy(), "Interpolate"), len(converted))
+
+    resolution_args = (skip_invalid_row, first_invalid_row_time)
+    processed = run(
+        "resolution_native", process_time_resolution_and_duplicates,
+        lambda: (cleaned.copy(), time_column, 15, "minutes", *resolution_args), len(cleaned)
+    )
+    run(
+        "resolution_hourly", process_time_resolution_and_duplicates,
+        lambda: (cleaned.copy(), time_column, 1, "hours", *resolution_args), len(cleaned)
+    )
+    run(
+        "resolution_5min", process_time_resolution_and_duplicates,
+        lambda: (cleaned.copy(), time_column, 5, "minutes", *resolution_args), len(cleaned)
+    )
+
+    run("trend_aggregates", compute_trend_aggregates, lambda: (processed,), len(processed))
+    run(
+        "chart_traces", lambda df: [time_series_trace(df[column], column) for column in df.columns],
+        lambda: (processed,), len(processed)
+    )
+    return records
+
+
+def collect_datasets(years, areas, include_fixtures=True):
+    """
+    Lists the bundled fixtures and writes (or reuses) synthetic exports for every years x areas combination.
+    """
+    paths = []
+    if include_fixtures:
+        paths += sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.csv")))
+        paths += sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.xlsx")))
+    data_dir = os.path.join(RESULTS_DIR, "data")
+    for year_count in years:
+        for area_count in areas:
+            paths.append(write_export(data_dir, TEMPLATE_FIXTURE, year_count, area_count))
+    return paths
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compares the median time of every (dataset, stage) with a baseline run.
+
+    Args:
+        results: dict
+            The current results, as written by this script.
+        baseline: dict
+            The baseline results, as written by this script.
+        threshold: float
+            The slowdown ratio above which a stage counts as a regression.
+
+    Returns:
+        list of dict: One row per stage found in both runs, with the ratio and a regression flag.
+    """
+    reference = {(record["dataset"], record["stage"]): record for record in baseline["results"]}
+    comparison = []
+    for record in results["results"]:
+        previous = reference.get((record["dataset"], record["stage"]))
+        if previous is None or not previous["seconds_median"]:
+            continue
+        ratio = record["seconds_median"] / previous["seconds_median"]
+        comparison.append({
+            "dataset": record["dataset"],
+            "stage": record["stage"],
+            "baseline_seconds": previous["seconds_median"],
+            "seconds": record["seconds_median"],
+            "ratio": ratio,
+            "regression": ratio > threshold,
+        })
+    return comparison
+
+
+def main(argv=None):
+    """
+    Command-line entry point: `python -m benchmarks.run_benchmarks [--years 1 3] [--areas 1 4] ...`.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the ingest-to-chart pipeline.")
+    parser.add_argument("--years", type=int, nargs="*", default=[2], help="Synthetic dataset lengths in years.")
+    parser.add_argument("--areas", type=int, nargs="*", default=[4], help="Synthetic dataset widths in areas.")
+    parser.add_argument("--no-fixtures", action="store_true", help="Skip the bundled data-for-tests files.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurement.")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"), help="Results file.")
+    parser.add_argument("--baseline", default=None, help="Results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+        },
+        "results": [],
+    }
+    for path in collect_datasets(args.years, args.areas, not args.no_fixtures):
+        records = benchmark_file(path, args.repeat, not args.no_memory)
+        results["results"].extend(records)
+        for record in records:
+            peak = "" if record["peak_bytes"] is None else f"{record['peak_bytes'] / 2 ** 20:8.1f} MiB"
+            print(f"{record['dataset'][:48]:48} {record['stage']:18} {record['seconds_median']:8.4f} s {peak}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            comparison = compare_results(results, json.load(baseline_file), args.threshold)
+        for row in comparison:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['dataset'][:48]:48} {row['stage']:18} {row['ratio']:6.2f}x {flag}")
+        if any(row["regression"] for row in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
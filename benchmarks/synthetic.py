@@ -0,0 +1,78 @@
+# synthetic.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from subs.data_loader import ENTSOE_TIME_FORMAT, SOURCE_TIMEZONE
+
+# Areas used for synthetic exports, in the two header styles ENTSO-E uses
+SYNTHETIC_AREAS = [
+    "Germany (DE)", "Netherlands (NL)", "BZN|ES", "France (FR)", "BZN|BE", "Austria (AT)",
+    "BZN|PL", "Italy (IT)", "BZN|DK1", "Czech Republic (CZ)", "BZN|PT", "Switzerland (CH)",
+]
+
+
+def generate_export(template_path, years=1, areas=1, start_year=2020, seed=0):
+    """
+    Generates a synthetic ENTSO-E "Total Load" export by scaling a real export to more years and areas.
+
+    The template's load profile is repeated over every year and scaled with a random factor and
+    noise for every area. Timestamps are written as local "dd.mm.YYYY HH:MM - dd.mm.YYYY HH:MM"
+    intervals, so the repeated autumn hour appears twice as in real exports. A missing value
+    ("n/e") is sprinkled in every few thousand rows.
+
+    Args:
+        template_path: str
+            A bundled 15-minute export to take the load profile from.
+        years: int
+            The number of consecutive years to generate.
+        areas: int
+            The number of areas (pairs of forecast/actual columns) to generate.
+        start_year: int
+            The first year of the generated data.
+        seed: int
+            The random seed.
+
+    Returns:
+        pandas DataFrame: The export, ready to be written with 'to_csv(index=False)'.
+    """
+    rng = np.random.default_rng(seed)
+    template = pd.read_csv(template_path, na_values=["n/e", "-"]).iloc[:, 1:].astype(float).interpolate().bfill()
+
+    start = pd.Timestamp(f"{start_year}-01-01", tz=SOURCE_TIMEZONE)
+    end = pd.Timestamp(f"{start_year + years}-01-01", tz=SOURCE_TIMEZONE)
+    starts = pd.date_range(start, end, freq="15min", inclusive="left")
+    # ENTSO-E computes interval ends on the wall clock, so both repeated autumn hours end at the same times
+    ends = starts.tz_localize(None) + pd.Timedelta(minutes=15)
+    time_values = (
+        starts.strftime(ENTSOE_TIME_FORMAT).str.cat(ends.strftime(ENTSOE_TIME_FORMAT), sep=" - ")
+    )
+
+    profile_positions = np.arange(len(starts)) % len(template)
+    export = {"Time (CET/CEST)": time_values}
+    for area in SYNTHETIC_AREAS[:areas] if areas <= len(SYNTHETIC_AREAS) else _numbered_areas(areas):
+        scale = rng.uniform(0.2, 3.0)
+        for position, quantity in enumerate(["Day-ahead Total Load Forecast [MW]", "Actual Total Load [MW]"]):
+            values = template.iloc[profile_positions, position].to_numpy() * scale
+            values = np.round(values * rng.normal(1.0, 0.01, len(values)))
+            column = pd.Series(values.astype(np.int64).astype(str))
+            column[rng.random(len(column)) < 0.0005] = "n/e"
+            export[f"{quantity} - {area}"] = column.values
+    return pd.DataFrame(export)
+
+
+def _numbered_areas(count):
+    # More areas than the named list: fall back to numbered bidding zones
+    return [f"BZN|Z{number:02d}" for number in range(count)]
+
+
+def write_export(directory, template_path, years=1, areas=1, **options):
+    """
+    Writes a synthetic export (see 'generate_export') as CSV and returns its path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic_{years}y_{areas}a.csv")
+    if not os.path.exists(path):
+        generate_export(template_path, years, areas, **options).to_csv(path, index=False)
+    return path
@@ -0,0 +1,43 @@
+# aggregation.py
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.data_loader import compute_column_statistics
+from subs.rollup import build_rollups
+
+
+@profiled
+def compute_trend_aggregates(df_read, rollups=None):
+    """
+    Computes everything the Trend Analysis page shows, for all columns at once.
+
+    The daily means, monthly peaks and monthly totals are read from the daily and monthly levels
+    of the data's rollup pyramid (see 'subs.rollup'), which groups on the local calendar and
+    builds each level from the one below it, so nothing is resampled from the raw rows again.
+    The summary statistics come from 'compute_column_statistics', which also treats all columns
+    in one pass.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame indexed by time.
+        rollups: RollupPyramid or None
+            The rollups of 'df_read'; built here if omitted.
+
+    Returns:
+        dict: DataFrames 'daily_mean', 'monthly_max', 'monthly_sum' and 'statistics'.
+    """
+    if rollups is None:
+        rollups = build_rollups(df_read)
+
+    monthly_max = rollups.level("month", "max")
+    monthly_sum = rollups.level("month", "sum")
+    # Months are labelled by their last day, as a monthly resample labels them
+    monthly_max.index = monthly_max.index + pd.offsets.MonthEnd(0)
+    monthly_sum.index = monthly_sum.index + pd.offsets.MonthEnd(0)
+
+    return {
+        "daily_mean": rollups.level("day", "mean"),
+        "monthly_max": monthly_max,
+        "monthly_sum": monthly_sum,
+        "statistics": compute_column_statistics(df_read),
+    }
@@ -0,0 +1,151 @@
+# cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from subs.profiling import record_cache
+
+# Upper bound for the memory held by the shared cache (in bytes)
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def content_hash(data):
+    """
+    Computes a stable hash of an uploaded file's content.
+
+    Args:
+        data: bytes or file-like object
+            The raw content of the file, or an object exposing `getvalue()` / `read()`.
+
+    Returns:
+        str: A hex digest identifying the content.
+    """
+    if hasattr(data, "getvalue"):
+        data = data.getvalue()
+    elif hasattr(data, "read"):
+        position = data.tell()
+        data.seek(0)
+        content = data.read()
+        data.seek(position)
+        data = content
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def make_key(stage, parent_key, *params):
+    """
+    Builds a cache key for a pipeline stage from the key of the stage before it and
+    the parameters of this stage.
+
+    Args:
+        stage: str
+            The name of the pipeline stage (e.g. 'load', 'clean').
+        parent_key: str
+            The content hash of the upload or the key of the previous stage.
+        *params:
+            The parameters that change the output of this stage.
+
+    Returns:
+        str: The cache key.
+    """
+    raw = "|".join([stage, str(parent_key)] + [repr(param) for param in params])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _copy_value(value):
+    # Pipeline stages modify their inputs in place, so hand out copies only
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy_value(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    return value
+
+
+def _size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, tuple):
+        return sum(_size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_size_of(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """
+    A thread-safe LRU cache for intermediate pipeline results, bounded by memory size.
+
+    Values are copied on the way in and out so callers can keep modifying the
+    frames they get back without corrupting the cached entries.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value, _ = self._entries[key]
+        return _copy_value(value)
+
+    def put(self, key, value):
+        value = _copy_value(value)
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            # Evict the least recently used entries until we are within budget
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_or_compute(self, key, func, *args, **kwargs):
+        """
+        Returns the cached value for 'key', computing and storing it with 'func' on a miss.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        stage = getattr(func, "__name__", "stage")
+        if value is not sentinel:
+            record_cache(stage, True)
+            return value
+        record_cache(stage, False)
+        value = func(*args, **kwargs)
+        # 'put' stores its own copy, so the fresh value can be returned as is
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+# Process-wide cache shared by every Streamlit session
+frame_cache = FrameCache()
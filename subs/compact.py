@@ -0,0 +1,199 @@
+# compact.py
+import copy
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.data_loader import process_time_resolution_and_duplicates
+
+# Decimal scales tried, in order, to store a float column exactly as int32 codes
+INT32_SCALES = (1, 10, 100, 1000)
+# The int32 code that stands for a missing value
+INT32_MISSING = np.iinfo(np.int32).min
+INT32_LIMIT = np.iinfo(np.int32).max
+
+# Process-wide register of compact frames by content digest. Entries live as long as a session
+# or the frame cache still holds the frame, so every session sees the same single copy.
+_shared_frames = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def _encode_column(values):
+    """
+    Stores a float64 column as scaled int32 codes if that round-trips exactly, else as float32.
+
+    ENTSO-E values are usually whole MW or have one or two decimals, so most columns fit in
+    int32 codes of value x scale without any loss. Columns with other values (interpolated gaps,
+    means of several rows) are kept as float32, about 7 significant digits.
+
+    Returns:
+        numpy array: The int32 codes or float32 values, read-only.
+        int or None: The scale of the int32 codes; None for float32.
+    """
+    missing = np.isnan(values)
+    present = values[~missing]
+    for scale in INT32_SCALES:
+        codes = np.round(present * scale)
+        if len(codes) and np.abs(codes).max() > INT32_LIMIT:
+            break
+        # The decoded value (code / scale) must equal the original exactly
+        if np.array_equal(codes / scale, present):
+            encoded = np.full(len(values), INT32_MISSING, dtype=np.int32)
+            encoded[~missing] = codes
+            encoded.flags.writeable = False
+            return encoded, scale
+    encoded = values.astype(np.float32)
+    encoded.flags.writeable = False
+    return encoded, None
+
+
+def _decode_column(encoded, scale):
+    # Always a new float64 array, so callers may modify the frames they get
+    values = encoded.astype(np.float64)
+    if scale is not None:
+        values[encoded == INT32_MISSING] = np.nan
+        values /= scale
+    return values
+
+
+class CompactFrame:
+    """
+    An immutable, memory-compact copy of a processed DataFrame.
+
+    Float columns are stored as scaled int32 codes or float32 (see '_encode_column'), half the
+    size of float64; other columns are kept as they are. A regular time index is stored as its
+    first timestamp, step and length instead of one datetime64 value per row. The frame is
+    decoded back to float64 with 'to_frame' whenever a page needs it.
+
+    Use 'compact_frame' to build one: it returns the single shared instance for identical data.
+    """
+
+    def __init__(self, df_read):
+        index = df_read.index
+        self.columns = df_read.columns
+        self.index_name = index.name
+        self.attrs = copy.deepcopy(df_read.attrs)
+        self.length = len(index)
+
+        # A regular datetime index is kept as start and step (UTC nanoseconds), any other as is
+        self.timezone = self.start = self.step = None
+        self._index = index
+        if isinstance(index, pd.DatetimeIndex) and self.length:
+            times = (index.tz_convert("UTC") if index.tz is not None else index).asi8
+            steps = np.diff(times)
+            if self.length == 1 or (steps[0] > 0 and (steps == steps[0]).all()):
+                self.timezone = index.tz
+                self.start = int(times[0])
+                self.step = int(steps[0]) if self.length > 1 else 0
+                self._index = None
+
+        # (values, scale) per column: int32 codes with their scale, float32 with None, or the
+        # original values of non-float columns with False
+        self.data = []
+        for position in range(df_read.shape[1]):
+            column = df_read.iloc[:, position]
+            if column.dtype.kind == "f":
+                self.data.append(_encode_column(column.to_numpy(dtype=np.float64)))
+            else:
+                self.data.append((column.copy(), False))
+        self.digest = self._content_digest()
+
+    def _content_digest(self):
+        # Identifies the data, so identical frames from any session share one instance
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((list(self.columns), self.index_name, self.attrs, str(self.timezone), self.start, self.step,
+                            [scale for _, scale in self.data])).encode("utf-8"))
+        if self._index is not None:
+            digest.update(pd.util.hash_pandas_object(self._index.to_series(), index=False).to_numpy().tobytes())
+        for values, scale in self.data:
+            if scale is False:
+                values = pd.util.hash_pandas_object(values, index=False).to_numpy()
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def __len__(self):
+        return self.length
+
+    def __sizeof__(self):
+        # Lets the frame cache account for the arrays rather than the Python object
+        index_bytes = 0 if self._index is None else self._index.memory_usage(deep=True)
+        return index_bytes + sum(
+            values.memory_usage(index=False, deep=True) if scale is False else values.nbytes
+            for values, scale in self.data
+        )
+
+    @property
+    def index(self):
+        """The index, rebuilt from its start and step if it is a regular time index."""
+        if self._index is not None:
+            return self._index.copy()
+        times = self.start + self.step * np.arange(self.length, dtype=np.int64)
+        index = pd.DatetimeIndex(times.view("datetime64[ns]"), name=self.index_name)
+        if self.timezone is not None:
+            index = index.tz_localize("UTC").tz_convert(self.timezone)
+        return index
+
+    def to_frame(self):
+        """
+        Decodes the data to a new pandas DataFrame with float64 value columns.
+
+        Returns:
+            pandas DataFrame: The processed DataFrame, equal to the one the frame was built from
+            except for the float32 rounding of float columns that do not fit int32 codes.
+        """
+        columns = [
+            values.to_numpy(copy=True) if scale is False else _decode_column(values, scale)
+            for values, scale in self.data
+        ]
+        df_read = pd.DataFrame(dict(enumerate(columns)), index=self.index, copy=False)
+        df_read.columns = self.columns
+        df_read.attrs = copy.deepcopy(self.attrs)
+        return df_read
+
+
+@profiled
+def compact_frame(df_read):
+    """
+    Returns the process-wide compact copy of a processed DataFrame.
+
+    The frame is encoded (see 'CompactFrame') and looked up by the digest of its content: if
+    any session already holds identical data, that instance is returned and the new encoding
+    is dropped. Sessions keep a reference to the shared instance in their state rather than a
+    DataFrame of their own.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame indexed by time.
+
+    Returns:
+        CompactFrame: The shared, read-only compact frame.
+    """
+    compact = CompactFrame(df_read)
+    with _shared_lock:
+        shared = _shared_frames.get(compact.digest)
+        if shared is None:
+            _shared_frames[compact.digest] = shared = compact
+    return shared
+
+
+@profiled
+def process_time_resolution_compact(*args, **kwargs):
+    """
+    Runs 'process_time_resolution_and_duplicates' and returns its result as a shared compact frame.
+
+    This is the resolution stage of the app: the compact frame is the only copy of the processed
+    data that is cached and kept in the session state. Tables, the export and the store are
+    built from it with 'CompactFrame.to_frame' when they are needed.
+
+    Args:
+        *args, **kwargs:
+            The arguments of 'process_time_resolution_and_duplicates'.
+
+    Returns:
+        CompactFrame: The shared, read-only compact frame of the processed data.
+    """
+    return compact_frame(process_time_resolution_and_duplicates(*args, **kwargs))
@@ -1,8 +1,50 @@
 # data_loader.py
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+from itertools import islice
+from operator import itemgetter
+
 import pandas as pd
 import numpy as np
-import streamlit as st
 
+from subs.profiling import profiled
+from subs.cache import content_hash, make_key
+from subs.jobs import report_progress
+
+# ENTSO-E exports time as "dd.mm.YYYY HH:MM - dd.mm.YYYY HH:MM" intervals
+ENTSOE_TIME_FORMAT = "%d.%m.%Y %H:%M"
+ENTSOE_INTERVAL_PATTERN = re.compile(r"^\d{2}\.\d{2}\.\d{4} \d{2}:\d{2} - \d{2}\.\d{2}\.\d{4} \d{2}:\d{2}")
+# Fixed-width positions of the interval start and end in the layout above
+INTERVAL_START_SLICE = (0, 16)
+INTERVAL_END_SLICE = (19, 35)
+# Local time of ENTSO-E "CET/CEST" exports; processed data is kept in UTC
+SOURCE_TIMEZONE = "Europe/Brussels"
+# Strings used by ENTSO-E and spreadsheet tools for missing values
+NA_VALUES = ["nan", "n/e", "no", "na"]
+# ENTSO-E puts "-" when data is missing for the future
+INVALID_VALUE = "-"
+# Number of CSV rows parsed at once by the streaming loader
+STREAM_CHUNK_ROWS = 100_000
+# Area codes in ENTSO-E column headers, e.g. "... - Germany (DE)" or "... - BZN|ES"
+AREA_PATTERN = re.compile(r"\s-\s(?:[A-Z]{3}\|(?P<code>[\w-]+)|.*\((?P<name_code>[\w-]+)\))\s*$")
+# Columnar formats written by 'save_processed' and read back by 'load_processed'
+PROCESSED_EXTENSIONS = (".parquet", ".arrow", ".feather")
+PROCESSED_METADATA_KEY = b"entsoe_processed"
+# Where parsed Excel worksheets are kept as Arrow files, so a workbook is only parsed once
+EXCEL_CACHE_DIR = os.environ.get("ENTSOE_EXCEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "entsoe-excel-cache"))
+# Size limit of the parsed worksheets in EXCEL_CACHE_DIR; the least recently used are removed beyond it
+EXCEL_CACHE_MAX_BYTES = int(os.environ.get("ENTSOE_EXCEL_CACHE_MAX_BYTES", 1024 ** 3))
+# Rows localized on each side of a single row to place it in UTC; the first copy of a repeated
+# autumn hour is at most an hour (60 rows at one-minute resolution) before the second one
+DST_CONTEXT_ROWS = 1440
+# Strategies offered for handling missing values
+MISSING_VALUE_OPTIONS = ["Remove", "Interpolate", "Time Interpolate", "Backward/Forward Filling", "Seasonal (Previous Week)"]
+
+@profiled
 def load_data(uploaded_file):
     """
     Load data from an uploaded file into a pandas DataFrame.
@@ -13,15 +55,513 @@ def load_data(uploaded_file):
     Returns:
         A pandas DataFrame containing the data from the uploaded file.
     """
-    na_values = ["nan", "n/e", "no", "na"]
     file_name = uploaded_file.name
     if file_name.endswith('.csv'):
-        return pd.read_csv(uploaded_file, na_values=na_values)
+        return pd.read_csv(uploaded_file, na_values=NA_VALUES)
     elif file_name.endswith(('.xls', '.xlsx')):
-        return pd.read_excel(uploaded_file, na_values=na_values)
+        return pd.read_excel(uploaded_file, na_values=NA_VALUES)
+    elif file_name.endswith(PROCESSED_EXTENSIONS):
+        # Previously processed data comes back with its parsed UTC time column first
+        return load_processed(uploaded_file).reset_index()
+    else:
+        raise ValueError("Unsupported file format. Please upload a CSV, Excel, Parquet or Arrow file.")
+
+
+def extract_area_code(column):
+    """
+    Extracts the area code from an ENTSO-E column header.
+
+    Args:
+        column: str
+            A column header such as "Actual Total Load [MW] - Germany (DE)" or "Actual Total Load [MW] - BZN|ES".
+
+    Returns:
+        str or None: The area code (e.g. "DE" or "ES"), or None if the header names no area.
+    """
+    match = AREA_PATTERN.search(str(column))
+    if match is None:
+        return None
+    return match.group("code") or match.group("name_code")
+
+
+@profiled
+def save_processed(df_read, destination, file_format="parquet", metadata=None):
+    """
+    Writes a processed DataFrame as Parquet or Arrow IPC with float32 columns and a UTC time index.
+
+    The schema metadata records the area codes found in the column headers together with any
+    'metadata' given (e.g. source file, cleaning method and resolution), so the file can be
+    reloaded with 'load_processed' without parsing timestamps or numbers again.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame indexed by time.
+        destination: str, path or file-like object
+            Where to write the file.
+        file_format: str
+            'parquet' or 'arrow'.
+        metadata: dict
+            Additional JSON-serialisable information stored with the data.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = df_read.astype(
+        {column: np.float32 for column in df_read.columns if pd.api.types.is_float_dtype(df_read[column])}
+    )
+    if isinstance(frame.index, pd.DatetimeIndex):
+        frame.index = frame.index.tz_localize("UTC") if frame.index.tz is None else frame.index.tz_convert("UTC")
+
+    areas = [extract_area_code(column) for column in frame.columns]
+    info = {"areas": sorted({area for area in areas if area}), **(metadata or {})}
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), PROCESSED_METADATA_KEY: json.dumps(info, default=str).encode("utf-8")}
+    )
+
+    if file_format == "parquet":
+        pq.write_table(table, destination)
+    elif file_format == "arrow":
+        with pa.ipc.new_file(destination, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unsupported output format: {file_format}")
+
+
+def processed_to_bytes(df_read, file_format="parquet", metadata=None):
+    """
+    Serialises a processed DataFrame with 'save_processed' for downloading.
+
+    Returns:
+        bytes: The Parquet or Arrow IPC file content.
+    """
+    buffer = io.BytesIO()
+    save_processed(df_read, buffer, file_format, metadata)
+    return buffer.getvalue()
+
+
+@profiled
+def load_processed(source):
+    """
+    Loads a file written by 'save_processed'.
+
+    Files on disk are memory-mapped; uploaded files are read from their in-memory buffer without
+    another copy. Arrow IPC files are read without any decoding at all.
+
+    Args:
+        source: str, path or file-like object
+            The Parquet or Arrow file to read.
+
+    Returns:
+        pandas DataFrame: The processed DataFrame indexed by UTC time, with the stored metadata
+        in its 'attrs["entsoe"]'.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(source, (str, os.PathLike)):
+        name = os.fspath(source)
+        buffer = pa.memory_map(name)
+    else:
+        name = source.name
+        buffer = pa.BufferReader(source.getvalue() if hasattr(source, "getvalue") else source.read())
+
+    if name.endswith(".parquet"):
+        table = pq.read_table(buffer)
+    else:
+        table = pa.ipc.open_file(buffer).read_all()
+
+    df_read = table.to_pandas(split_blocks=True)
+    metadata = (table.schema.metadata or {}).get(PROCESSED_METADATA_KEY)
+    df_read.attrs["entsoe"] = json.loads(metadata) if metadata else {}
+    return df_read
+
+
+def _open_source(source):
+    # Accept both paths and uploaded file objects, rewinding the latter. Use it in a 'with'
+    # block: files opened from a path are closed on exit, the caller's file objects are not
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    source.seek(0)
+    return contextlib.nullcontext(source)
+
+
+def _count_rows(source):
+    # Upper bound on the number of data rows, used to pre-size the buffers
+    if hasattr(source, "getvalue"):
+        return source.getvalue().count(b"\n") + 1
+    line_count = 0
+    with _open_source(source) as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            line_count += block.count(b"\n")
+    return line_count + 1
+
+
+def read_header(source):
+    """
+    Reads only the column names of a CSV export.
+
+    Args:
+        source: str, path or file-like object
+            The CSV file to read.
+
+    Returns:
+        pandas Index: The column names.
+    """
+    with _open_source(source) as handle:
+        return pd.read_csv(handle, nrows=0).columns
+
+
+@profiled
+def load_data_streaming(source, time_column=None, chunksize=STREAM_CHUNK_ROWS, skip_rows=0):
+    """
+    Loads a CSV export in chunks into a single pre-sized float32 buffer.
+
+    Each chunk has its timestamps parsed, its "n/e" and "-" sentinels coerced to NaN and its
+    values downcast to float32 before the next chunk is read, so peak memory stays close to
+    the size of the final buffer instead of several copies of the raw file. The local start
+    times are localized to UTC once all chunks are in, so DST transitions that straddle a
+    chunk boundary are still resolved correctly.
+
+    Args:
+        source: str, path or file-like object
+            The CSV file to read.
+        time_column: str
+            The name of the column with date and time observations. Defaults to the first column.
+        chunksize: int
+            The number of rows parsed per chunk.
+        skip_rows: int
+            The number of leading data rows to skip without parsing them.
+
+    Returns:
+        pandas DataFrame: The DataFrame with the UTC time column first and float32 value columns.
+        skip_invalid_row: str
+            A flag ("True" or "False") matching the one returned by 'process_data_for_analysis'.
+        first_invalid_row_time: datetime or np.nan
+            The UTC timestamp of the first row containing "-", if present; otherwise, np.nan.
+    """
+    capacity = _count_rows(source)
+    columns = read_header(source)
+    time_column = columns[0] if time_column is None else time_column
+    value_columns = [column for column in columns if column != time_column]
+
+    local_times = np.empty(capacity, dtype="datetime64[ns]")
+    # Column-major, so every value column is one contiguous block, as the DataFrame stores it
+    values = np.empty((capacity, len(value_columns)), dtype=np.float32, order="F")
+    first_invalid_row = None
+    row_count = 0
+
+    # Both the file opened from a path and the chunk reader are closed once parsing ends
+    with _open_source(source) as handle, pd.read_csv(
+        handle, na_values=NA_VALUES, dtype={time_column: str}, chunksize=chunksize,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+    ) as reader:
+        for chunk in reader:
+            chunk_rows = len(chunk)
+            stop = row_count + chunk_rows
+            local_times[row_count:stop] = parse_interval_timestamps(chunk[time_column])["start"].values
+
+            invalid_rows = np.zeros(chunk_rows, dtype=bool)
+            for position, column in enumerate(value_columns):
+                column_values = chunk[column]
+                if column_values.dtype == object:
+                    invalid_rows |= column_values.eq(INVALID_VALUE).values
+                    column_values = pd.to_numeric(column_values, errors="coerce")
+                values[row_count:stop, position] = column_values.values
+            if invalid_rows.any() and first_invalid_row is None:
+                first_invalid_row = row_count + invalid_rows.argmax()
+            row_count = stop
+            del chunk
+            report_progress(row_count / capacity, f"{row_count:,} rows parsed")
+
+    return _finish_streamed(local_times[:row_count], values[:row_count], time_column, value_columns, first_invalid_row)
+
+
+def _finish_streamed(local_times, values, time_column, value_columns, first_invalid_row):
+    # Localize the parsed local start times to UTC and build the streaming loaders' return values
+    timezone = infer_source_timezone(time_column)
+    utc_times = localize_to_utc(pd.DataFrame({"start": local_times}), timezone)
+
+    df_read = pd.DataFrame(values, columns=value_columns, copy=False)
+    df_read.insert(0, time_column, utc_times)
+    # Only the placeholder rows of the skipped spring hour have no time; filter (and copy) only then
+    if df_read[time_column].isna().any():
+        df_read = df_read[df_read[time_column].notna()]
+
+    skip_invalid_row = "True"
+    first_invalid_row_time = np.nan
+    if first_invalid_row is not None:
+        # Take the time from the localized rows, so a "-" in the repeated autumn hour keeps
+        # its own occurrence; placeholder rows of the skipped spring hour have none
+        later_times = utc_times[first_invalid_row:]
+        later_times = later_times[later_times.notna()]
+        if len(later_times):
+            skip_invalid_row = "False"
+            first_invalid_row_time = later_times[0]
+    return df_read, skip_invalid_row, first_invalid_row_time
+
+
+def _excel_input(source):
+    # Excel readers take a path or an open binary file; hand them the path where there is one
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    source.seek(0)
+    return source
+
+
+def _calamine_workbook():
+    # python-calamine (a Rust reader) is optional; it parses .xlsx several times faster than openpyxl
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        return None
+    return CalamineWorkbook
+
+
+def _iter_excel_rows(source, sheet_name=None):
+    # Yield the cell values of one worksheet row by row, with the fastest reader available
+    name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else source.name
+    if name.lower().endswith(".xls"):
+        # Legacy workbooks have no streaming reader; read them once as raw objects
+        sheet = pd.read_excel(_excel_input(source), sheet_name=sheet_name or 0, header=None, dtype=object)
+        yield from sheet.itertuples(index=False, name=None)
+        return
+
+    CalamineWorkbook = _calamine_workbook()
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_object(_excel_input(source))
+        sheet = workbook.get_sheet_by_name(sheet_name or workbook.sheet_names[0])
+        yield from sheet.iter_rows()
+        return
+
+    from openpyxl import load_workbook
+
+    # Read-only mode parses the sheet XML lazily instead of building the whole workbook
+    workbook = load_workbook(_excel_input(source), read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def list_excel_sheets(source):
+    """
+    Lists the worksheet names of an Excel workbook without reading any cells.
+
+    Args:
+        source: str, path or file-like object
+            The workbook to inspect.
+
+    Returns:
+        list of str: The sheet names, in workbook order.
+    """
+    name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else source.name
+    if name.lower().endswith(".xls"):
+        return pd.ExcelFile(_excel_input(source)).sheet_names
+    CalamineWorkbook = _calamine_workbook()
+    if CalamineWorkbook is not None:
+        return CalamineWorkbook.from_object(_excel_input(source)).sheet_names
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_excel_input(source), read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def read_excel_header(source, sheet_name=None):
+    """
+    Reads only the column names of one worksheet of an Excel export.
+
+    Args:
+        source: str, path or file-like object
+            The workbook to read.
+        sheet_name: str
+            The worksheet to read. Defaults to the first one.
+
+    Returns:
+        pandas Index: The column names.
+    """
+    rows = _iter_excel_rows(source, sheet_name)
+    header = next(rows, ())
+    rows.close()
+    return pd.Index([str(cell) for cell in header if cell not in (None, "")])
+
+
+def _excel_cache_path(source, sheet_name, time_column, value_columns, cache_dir):
+    # The parsed sheet is identified by the workbook's content and the selection read from it
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as workbook_file:
+            digest = content_hash(workbook_file)
     else:
-        raise ValueError("Unsupported file format. Please upload a CSV or Excel file.")
+        digest = content_hash(source)
+    key = make_key("excel", digest, sheet_name, time_column, value_columns)
+    return os.path.join(cache_dir, f"{key}.arrow")
 
+
+def _prune_excel_cache(cache_dir, max_bytes=EXCEL_CACHE_MAX_BYTES, keep=None):
+    """
+    Removes the least recently used parsed worksheets until 'cache_dir' is within 'max_bytes'.
+
+    Files are ordered by modification time, which a cache hit refreshes, so the sheets used most
+    recently are kept. The file in 'keep' (the one just written) is never removed.
+
+    Args:
+        cache_dir: str
+            The directory of the parsed Arrow files.
+        max_bytes: int
+            The total size the directory may hold.
+        keep: str or None
+            A file to keep even if it alone exceeds the limit.
+
+    Returns:
+        int: The number of files removed.
+    """
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.name.endswith(".arrow"):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue  # Removed by another session meanwhile
+                entries.append((info.st_mtime, info.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.samefile(path, keep):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+@profiled
+def load_excel_streaming(source, sheet_name=None, time_column=None, value_columns=None,
+                         chunksize=STREAM_CHUNK_ROWS, cache_dir=EXCEL_CACHE_DIR, skip_rows=0):
+    """
+    Loads one worksheet of an Excel export row by row into float32 arrays, like 'load_data_streaming'.
+
+    The sheet is read with python-calamine when it is installed and with openpyxl's read-only
+    reader otherwise, so the workbook is never materialised as Python cell objects. Only the
+    time column and the selected value columns are kept; each chunk of rows is converted
+    straight to parsed timestamps and float32 values. The result is written to 'cache_dir' as
+    an Arrow file keyed on the workbook's content and the selection, so the same workbook is
+    only parsed once, even across sessions and restarts; the least recently used files are
+    removed once the directory exceeds EXCEL_CACHE_MAX_BYTES.
+
+    Args:
+        source: str, path or file-like object
+            The .xlsx (or .xls) file to read.
+        sheet_name: str
+            The worksheet to read. Defaults to the first one.
+        time_column: str
+            The name of the column with date and time observations. Defaults to the first column.
+        value_columns: list of str
+            The value columns to keep. Defaults to every other column.
+        chunksize: int
+            The number of rows converted at once.
+        cache_dir: str or None
+            The directory for the parsed Arrow files; None disables the file cache.
+        skip_rows: int
+            The number of leading data rows to skip without converting them. Partial reads are
+            not written to the file cache.
+
+    Returns:
+        pandas DataFrame: The DataFrame with the UTC time column first and float32 value columns.
+        skip_invalid_row: str
+            A flag ("True" or "False") matching the one returned by 'process_data_for_analysis'.
+        first_invalid_row_time: datetime or np.nan
+            The UTC timestamp of the first row containing "-", if present; otherwise, np.nan.
+    """
+    # Look for an earlier parse of the same selection before opening the workbook at all
+    cache_path = None
+    if cache_dir is not None and not skip_rows:
+        requested_columns = None if value_columns is None else list(value_columns)
+        cache_path = _excel_cache_path(source, sheet_name, time_column, requested_columns, cache_dir)
+        try:
+            cached = load_processed(cache_path)
+            # Mark the sheet as recently used, so pruning removes other sheets first
+            os.utime(cache_path)
+        except FileNotFoundError:
+            cached = None
+        if cached is not None:
+            info = cached.attrs["entsoe"]
+            first_invalid_row_time = info["first_invalid_row_time"]
+            first_invalid_row_time = np.nan if first_invalid_row_time is None else pd.Timestamp(first_invalid_row_time)
+            return cached.reset_index(), info["skip_invalid_row"], first_invalid_row_time
+
+    rows = _iter_excel_rows(source, sheet_name)
+    columns = [str(cell) if cell not in (None, "") else None for cell in next(rows, ())]
+    time_column = columns[0] if time_column is None else time_column
+    if value_columns is None:
+        value_columns = [column for column in columns if column not in (None, time_column)]
+    value_columns = list(value_columns)
+
+    # Skipped rows are only read past, not converted
+    next(islice(rows, skip_rows, skip_rows), None)
+
+    time_position = columns.index(time_column)
+    select = itemgetter(time_position, *[columns.index(column) for column in value_columns])
+    time_blocks, value_blocks = [], []
+    first_invalid_row = None
+    row_count = 0
+    while True:
+        block = list(islice(rows, chunksize))
+        if not block:
+            break
+        # Trailing rows of a sheet are often empty; skip rows without a timestamp
+        cells = np.array([select(row) for row in block if row[time_position] not in (None, "")], dtype=object)
+        if len(cells) == 0:
+            continue
+        cells = cells.reshape(len(cells), len(value_columns) + 1)
+        local_times = parse_interval_timestamps(pd.Series(cells[:, 0]))["start"].values
+
+        values = np.empty((len(cells), len(value_columns)), dtype=np.float32)
+        invalid_rows = np.zeros(len(cells), dtype=bool)
+        for position in range(len(value_columns)):
+            column_values = cells[:, position + 1]
+            invalid_rows |= column_values == INVALID_VALUE
+            values[:, position] = pd.to_numeric(pd.Series(column_values), errors="coerce").values
+        if invalid_rows.any() and first_invalid_row is None:
+            first_invalid_row = row_count + invalid_rows.argmax()
+        row_count += len(cells)
+        time_blocks.append(local_times)
+        value_blocks.append(values)
+        report_progress(message=f"{row_count:,} rows parsed")
+
+    local_times = np.concatenate(time_blocks) if time_blocks else np.empty(0, dtype="datetime64[ns]")
+    values = np.concatenate(value_blocks) if value_blocks else np.empty((0, len(value_columns)), dtype=np.float32)
+    result = _finish_streamed(local_times, values, time_column, value_columns, first_invalid_row)
+
+    if cache_path is not None:
+        df_read, skip_invalid_row, first_invalid_row_time = result
+        metadata = {
+            "skip_invalid_row": skip_invalid_row,
+            "first_invalid_row_time": None if pd.isna(first_invalid_row_time) else first_invalid_row_time.isoformat(),
+        }
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary name first so concurrent readers never see a partial file
+            partial_path = f"{cache_path}.{os.getpid()}.partial"
+            save_processed(df_read.set_index(time_column), partial_path, "arrow", metadata)
+            os.replace(partial_path, cache_path)
+            _prune_excel_cache(cache_dir, keep=cache_path)
+        except OSError:
+            # The file cache is only an optimisation; the parsed data is returned either way
+            pass
+    return result
+
+@profiled
 def process_data_for_analysis(df_read, time_column):
     """
     Prepares the data for analysis by setting a specified time column as the index and 
@@ -50,104 +590,554 @@ def process_data_for_analysis(df_read, time_column):
     # Find the first row with '-'
     # ENTSO-e puts "-" when data is missing for the future
     first_invalid_row_time =np.nan
-    if (df_read == "-").any().any():
-        first_invalid_row = df_read.eq("-").any(axis=1).idxmax()
-        skip_invalid_row = "False"
-    else:
-        skip_invalid_row = "True"
-
-    if skip_invalid_row == True:
-        first_invalid_row_time = first_invalid_row.split(" - ")[0]
-
-        first_invalid_row_time = pd.to_datetime(
-            first_invalid_row_time, format="%d.%m.%Y %H:%M"
-        )
+    skip_invalid_row = "True"
+    invalid_rows = df_read.eq("-").to_numpy().any(axis=1)
+    if invalid_rows.any():
+        first_invalid_row = int(invalid_rows.argmax())
+        # Localize the rows around it rather than the row alone: its UTC time depends on the rows
+        # before it in the repeated autumn hour, and a row in the skipped spring hour has none, so
+        # the trim starts at the first row after it that has one, as in '_finish_streamed'
+        start = max(first_invalid_row - DST_CONTEXT_ROWS, 0)
+        window = pd.Series(df_read.index[start:first_invalid_row + DST_CONTEXT_ROWS])
+        utc_times = localize_to_utc(parse_interval_timestamps(window), infer_source_timezone(time_column))
+        later_times = utc_times[first_invalid_row - start:]
+        later_times = later_times[later_times.notna()]
+        if len(later_times):
+            skip_invalid_row = "False"
+            first_invalid_row_time = later_times[0]
    
     # reset the index
     df_read.reset_index(inplace=True)
     return df_read , skip_invalid_row , first_invalid_row_time
 
 
-def process_uploaded_file(df, job_filter):
+def _to_float_array(df):
+    # Coerce every column to numbers once and stack them into one 2-D float array
+    numeric_columns = [
+        df[column] if pd.api.types.is_float_dtype(df[column]) else pd.to_numeric(df[column], errors="coerce")
+        for column in df.columns
+    ]
+    dtype = np.result_type(np.float32, *[column.dtype for column in numeric_columns])
+    values = np.empty((len(df), len(numeric_columns)), dtype=dtype)
+    for position, column in enumerate(numeric_columns):
+        values[:, position] = column.values
+    return values
+
+
+def _long_gap_mask(missing, max_gap):
+    """
+    Marks the missing values that belong to gaps longer than 'max_gap' consecutive rows.
+
+    Gap starts and ends are found for all columns at once from the row-wise difference of the
+    missing-value mask, and the mask of long gaps is rebuilt with a single cumulative sum.
+    """
+    row_count, column_count = missing.shape
+    padded = np.zeros((column_count, row_count + 2), dtype=np.int8)
+    padded[:, 1:-1] = missing.T
+    edges = np.diff(padded, axis=1)
+    gap_columns, gap_starts = np.nonzero(edges == 1)
+    _, gap_ends = np.nonzero(edges == -1)
+    long_gaps = (gap_ends - gap_starts) > max_gap
+
+    markers = np.zeros((column_count, row_count + 1), dtype=np.int32)
+    np.add.at(markers, (gap_columns[long_gaps], gap_starts[long_gaps]), 1)
+    np.add.at(markers, (gap_columns[long_gaps], gap_ends[long_gaps]), -1)
+    return np.cumsum(markers, axis=1)[:, :-1].T > 0
+
+
+def _seasonal_fill(values, times, period=pd.Timedelta(weeks=1), timezone=SOURCE_TIMEZONE):
+    # Fill each missing value from the same local wall-clock time one period earlier, if that value
+    # exists, so the previous week's slot stays the same hour of the day across DST changes. Wall-clock
+    # times repeat in the autumn hour, so they are looked up in sorted order (first occurrence wins)
+    if times.tz is not None:
+        times = times.tz_convert(timezone).tz_localize(None)
+    time_values = times.asi8
+    order = np.argsort(time_values, kind="stable")
+    sorted_times = time_values[order]
+    wanted = time_values - period.value
+    found = np.minimum(np.searchsorted(sorted_times, wanted), len(time_values) - 1)
+    has_previous = sorted_times[found] == wanted
+    candidates = values[order[found]]
+    fillable = np.isnan(values) & has_previous[:, None] & ~np.isnan(candidates)
+    values = values.copy()
+    values[fillable] = candidates[fillable]
+    return values
+
+
+@profiled
+def process_uploaded_file(df, job_filter, max_gap=None):
     """
     Processes an uploaded file by converting data types to numeric and handling missing values.
 
-    This function takes a DataFrame and a job filter option. It first converts the data types of all
-    columns, except the first one, to numeric, handling any errors with coercion. It then processes
-    missing values in the DataFrame based on the specified job filter option, which can be to remove,
-    interpolate, or forward/backward fill the missing values.
+    This function takes a DataFrame and a job filter option. All columns except the first one are
+    coerced to numeric once and stacked into a single 2-D float array, and the chosen strategy is
+    applied to every column in one vectorized pass. The strategies are to remove rows, interpolate
+    linearly or in time, forward/backward fill, or fill from the same time slot in the previous week.
 
     Args:
         df: pandas DataFrame
-            The DataFrame extracted from the uploaded file.
+            The DataFrame extracted from the uploaded file, with the time column first.
         job_filter: str
-            The method chosen for handling missing values. Options include 'Remove',
-            'Interpolate', and 'Backward/Forward Filling'.
+            The method chosen for handling missing values, one of MISSING_VALUE_OPTIONS. The
+            'Time Interpolate' and 'Seasonal (Previous Week)' options require the time column
+            to be parsed with 'convert_time' first.
+        max_gap: int or None
+            Only gaps of at most this many consecutive rows are filled; longer gaps are left
+            missing. None fills gaps of any length.
 
-    Displays:
-        The processed DataFrame is displayed in the Streamlit app.
+    Returns:
+        pandas DataFrame: The DataFrame with missing values handled.
+        fill_report: pandas DataFrame
+            The number of missing, filled and remaining missing values for each column.
     """
+    time_column = df.columns[0]
+    value_columns = df.columns[1:]
+    values = _to_float_array(df[value_columns])
+    missing = np.isnan(values)
+    missing_counts = missing.sum(axis=0)
 
+    time_aware = job_filter in ("Time Interpolate", "Seasonal (Previous Week)")
+    if time_aware and not pd.api.types.is_datetime64_any_dtype(df[time_column]):
+        raise ValueError(f"'{job_filter}' needs the time column to be converted to datetime first.")
 
-    # Convert data types of columns to numeric, starting from the second column
-    for column in df.columns[1:]:
-        df[column] = pd.to_numeric(df[column], errors="coerce")
-
-    # Handle missing values based on the job_filter option
-    for column in df.columns[1:]:
-        if job_filter == "Remove":
-            # Remove rows with missing values
-            df = df.dropna()
-        elif job_filter == "Interpolate":
+    if job_filter == "Remove":
+        # Remove rows with missing values
+        keep = ~missing.any(axis=1)
+        filled = values[keep]
+        index = df.index[keep]
+    else:
+        index = df.index
+        frame = pd.DataFrame(values, copy=False)
+        if job_filter == "Interpolate":
             # Interpolate missing values
-            df = df.interpolate()
+            filled = frame.interpolate().to_numpy()
+        elif job_filter == "Time Interpolate":
+            # Interpolate missing values in proportion to the time between observations
+            frame.index = pd.DatetimeIndex(df[time_column])
+            filled = frame.interpolate(method="time").to_numpy()
         elif job_filter == "Backward/Forward Filling":
             # Forward fill followed by backward fill for missing values
-            df = df.ffill().bfill()
-    return df        
+            filled = frame.ffill().bfill().to_numpy()
+        elif job_filter == "Seasonal (Previous Week)":
+            filled = _seasonal_fill(values, pd.DatetimeIndex(df[time_column]))
+        else:
+            raise ValueError(f"Unknown method for handling missing values: {job_filter}")
+
+        if max_gap is not None and missing.any():
+            filled[_long_gap_mask(missing, max_gap)] = np.nan
+
+    remaining_counts = np.isnan(filled).sum(axis=0)
+    fill_report = pd.DataFrame(
+        {
+            "Missing Values": missing_counts,
+            "Filled Values": missing_counts - remaining_counts if job_filter != "Remove" else 0,
+            "Remaining Missing": remaining_counts,
+        },
+        index=value_columns,
+    )
+
+    time_values = df[time_column] if job_filter != "Remove" else df[time_column][keep]
+    df = pd.DataFrame(filled, columns=value_columns, index=index, copy=False)
+    df.insert(0, time_column, time_values)
+    return df, fill_report
+
+
+@profiled
+def parse_interval_timestamps(time_values):
+    """
+    Parses ENTSO-E interval timestamps into interval start and end times.
+
+    The ENTSO-E layout ("dd.mm.YYYY HH:MM - dd.mm.YYYY HH:MM") is checked once on the first value
+    and, if it matches, both ends of the interval are parsed with a fixed format from fixed-width
+    slices. Only the rows that fail this fast path are parsed with the generic format inference.
+    Plain (non-interval) timestamps go through the generic path and get no end time.
+
+    Args:
+        time_values: pandas Series
+            The raw time strings.
+
+    Returns:
+        pandas DataFrame: A DataFrame with datetime64 columns 'start' and 'end', aligned with 'time_values'.
+    """
+    time_values = time_values.astype(str)
+    start = pd.Series(pd.NaT, index=time_values.index, dtype="datetime64[ns]")
+    end = pd.Series(pd.NaT, index=time_values.index, dtype="datetime64[ns]")
+
+    if len(time_values) and ENTSOE_INTERVAL_PATTERN.match(time_values.iloc[0]):
+        start = pd.to_datetime(
+            time_values.str.slice(*INTERVAL_START_SLICE), format=ENTSOE_TIME_FORMAT, errors="coerce"
+        )
+        end = pd.to_datetime(
+            time_values.str.slice(*INTERVAL_END_SLICE), format=ENTSOE_TIME_FORMAT, errors="coerce"
+        )
+
+    # Fall back to the generic parser only for the rows the fast path could not handle
+    failed = start.isna()
+    if failed.any():
+        parts = time_values[failed].str.split(" - ", n=1, expand=True)
+        start[failed] = pd.to_datetime(parts[0], format="mixed", errors="coerce")
+        if parts.shape[1] > 1:
+            end[failed] = pd.to_datetime(parts[1], format="mixed", errors="coerce")
+
+    return pd.DataFrame({"start": start, "end": end})
+
+
+def infer_source_timezone(time_column):
+    """
+    Infers the timezone of the exported timestamps from the time column header,
+    e.g. "Time (CET/CEST)" or "Time (UTC)".
+
+    Args:
+        time_column: str
+            The name of the time column.
+
+    Returns:
+        str: The name of the timezone the timestamps are expressed in.
+    """
+    return "UTC" if "UTC" in str(time_column).upper() else SOURCE_TIMEZONE
+
+
+def localize_to_utc(intervals, timezone=SOURCE_TIMEZONE):
+    """
+    Localizes interval start times given in local wall-clock time and converts them to UTC.
+
+    Most rows are localized in a single vectorized call. Only the few rows around the DST
+    transitions are resolved separately: starts inside the skipped spring hour do not exist
+    and become NaT, and starts inside the repeated autumn hour are assigned to summer time
+    on their first occurrence and to winter time on their second. ENTSO-E gives both copies
+    of the repeated hour the same wall-clock end time, so the interval ends cannot tell them
+    apart and file order is used instead.
+
+    Args:
+        intervals: pandas DataFrame
+            The 'start' and 'end' columns returned by 'parse_interval_timestamps'.
+        timezone: str
+            The timezone of the wall-clock times.
+
+    Returns:
+        pandas DatetimeIndex: The interval start times in UTC.
+    """
+    local = pd.DatetimeIndex(intervals["start"])
+    if local.tz is not None:
+        return local.tz_convert("UTC")
+    if timezone == "UTC":
+        return local.tz_localize("UTC")
+
+    localized = local.tz_localize(timezone, ambiguous="NaT", nonexistent="NaT")
+    unresolved = np.flatnonzero(localized.isna() & local.notna())
+    if len(unresolved) == 0:
+        return localized.tz_convert("UTC")
+
+    # Resolve the handful of ambiguous rows by their order of occurrence
+    transition_times = local[unresolved]
+    is_summer_time = ~transition_times.duplicated(keep="first")
+    resolved = transition_times.tz_localize(timezone, ambiguous=is_summer_time, nonexistent="NaT")
+
+    utc_values = localized.tz_convert("UTC").asi8.copy()
+    utc_values[unresolved] = resolved.tz_convert("UTC").asi8
+    return pd.DatetimeIndex(utc_values.view("datetime64[ns]")).tz_localize("UTC")
+
 
+def to_local_time(df_read, timezone=SOURCE_TIMEZONE):
+    """
+    Returns the DataFrame with its UTC index converted to local time for display and calendar grouping.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame with a datetime index.
+        timezone: str
+            The timezone to convert to.
 
+    Returns:
+        pandas DataFrame: The DataFrame indexed in local time.
+    """
+    if isinstance(df_read.index, pd.DatetimeIndex) and df_read.index.tz is not None:
+        return df_read.tz_convert(timezone)
+    return df_read
+
+
+@profiled
 def convert_time(df, time_column):
     """
     Converts a time column in a DataFrame to a consistent datetime format.
 
+    Interval start times are localized from the export's timezone and stored in UTC, so DST
+    transition days keep every real observation. Rows that fall into the skipped spring
+    hour (which ENTSO-E exports as empty placeholders) are dropped.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the time data.
         time_column (str): The name of the time column to be converted.
 
     Returns:
-        pd.DataFrame: The DataFrame with the time column converted to datetime.
+        pd.DataFrame: The DataFrame with the time column converted to UTC datetime.
+    """
+
+    # Frames from the streaming loader already carry parsed UTC times
+    if pd.api.types.is_datetime64_any_dtype(df[time_column]):
+        return df
+
+    # Keep the start of each interval (or the timestamp itself for non-interval data)
+    intervals = parse_interval_timestamps(df[time_column])
+    df[time_column] = localize_to_utc(intervals, infer_source_timezone(time_column))
+
+    # Drop the placeholder rows of the skipped spring hour
+    if df[time_column].isna().any():
+        df = df[df[time_column].notna()]
+
+    return df
+
+
+def infer_native_frequency(index):
+    """
+    Infers the native sampling interval of a datetime index from the median spacing of its rows.
+
+    Unlike looking at a single difference, the median is not thrown off by gaps, duplicated
+    rows or DST transitions.
+
+    Args:
+        index: pandas DatetimeIndex
+            The sorted time index.
+
+    Returns:
+        pandas Timedelta: The native sampling interval, or NaT if it cannot be inferred.
+    """
+    differences = np.diff(index.asi8)
+    differences = differences[differences > 0]
+    if len(differences) == 0:
+        return pd.NaT
+    return pd.Timedelta(int(np.median(differences)), unit="ns")
+
+
+def local_midnight(time, timezone=SOURCE_TIMEZONE):
+    """
+    Returns midnight of the local calendar day of 'time', in the timezone of 'time'.
+
+    Args:
+        time: pandas Timestamp
+            A UTC (or naive) time.
+        timezone: str
+            The timezone of the calendar day; naive times are taken as local already.
+
+    Returns:
+        pandas Timestamp: The local midnight.
     """
+    if time.tz is None:
+        return time.normalize()
+    return time.tz_convert(timezone).normalize().tz_convert(time.tz)
 
-    if " - " in df[time_column].iloc[0]:
-        # Split the time interval into start and end times
-        df["Start Time"] = df[time_column].str.split(" - ", expand=True)[0]
 
-        # Drop the original time column
-        df.drop(time_column, inplace=True, axis=1)
+def resample_bins(start, end, target_frequency, origin=None, timezone=SOURCE_TIMEZONE):
+    """
+    Returns the start times of the bins that hold the times from 'start' to 'end' at a resolution.
 
-        # Convert the "Start Time" to datetime
-        df["Start Time"] = pd.to_datetime(df["Start Time"], format="mixed")
+    Bins are aligned to local midnight rather than UTC midnight, so that daily products are
+    local days. Targets above one hour that divide a day start again at every local midnight,
+    and targets of whole days are calendar days; over DST changes these bins are an hour
+    shorter or longer (a wall-clock time skipped in spring starts its bin at the next existing
+    time, and a repeated one in autumn starts it at the first occurrence). Other targets, and
+    naive indexes, have bins of fixed width counted from the origin.
 
-        # Assign the datetime values to the original time column name
-        df[time_column] = df["Start Time"]
+    Args:
+        start: pandas Timestamp
+            The first time to cover.
+        end: pandas Timestamp
+            The last time to cover.
+        target_frequency: pandas Timedelta
+            The target time resolution.
+        origin: pandas Timestamp or None
+            The local midnight the bins are counted from; defaults to the one of 'start'. Runs that
+            cover different periods of the same series share their bins if they share the origin.
+        timezone: str
+            The timezone of the calendar days.
 
-        # Drop the "Start Time" column
-        df.drop("Start Time", inplace=True, axis=1)
+    Returns:
+        pandas DatetimeIndex: The bin starts, in the timezone of 'start', the first one at or before 'start'.
+        bool: Whether the bins have a fixed width.
+    """
+    target_frequency = pd.Timedelta(target_frequency)
+    origin = local_midnight(start, timezone) if origin is None else pd.Timestamp(origin)
+    day = pd.Timedelta(days=1)
+    divides_day = target_frequency < day and day % target_frequency == pd.Timedelta(0)
+    whole_days = target_frequency >= day and target_frequency % day == pd.Timedelta(0)
+
+    if start.tz is None or target_frequency <= pd.Timedelta(hours=1) or not (divides_day or whole_days):
+        first_bin = origin + ((start - origin) // target_frequency) * target_frequency
+        return pd.date_range(first_bin, end, freq=target_frequency), True
+
+    # Calendar bins are laid out on wall-clock times and localized afterwards
+    local_start = start.tz_convert(timezone).tz_localize(None)
+    local_end = end.tz_convert(timezone).tz_localize(None)
+    if whole_days:
+        step = (target_frequency // day) * day
+        local_origin = origin.tz_convert(timezone).tz_localize(None).normalize()
+        first_day = local_origin + ((local_start.normalize() - local_origin) // step) * step
+        edges = pd.date_range(first_day, local_end, freq=step)
     else:
-        # Convert the time data to datetime
-        df[time_column] = pd.to_datetime(df[time_column], format="mixed")
+        days = pd.date_range(local_start.normalize(), local_end.normalize(), freq="D")
+        offsets = np.arange(day // target_frequency, dtype=np.int64) * target_frequency.value
+        edges = pd.DatetimeIndex((days.asi8[:, None] + offsets).ravel())
+        edges = edges[edges <= local_end]
+    edges = edges.tz_localize(
+        timezone, ambiguous=np.ones(len(edges), dtype=bool), nonexistent="shift_forward"
+    ).tz_convert(start.tz)
+    return edges[max(edges.searchsorted(start, side="right") - 1, 0):], False
 
-    return df
 
+def _reduce_bins(values, positions, bin_count, method):
+    # Reduce the rows of each bin, given the sorted bin position of every row, ignoring missing
+    # values; bins without rows get a sum of zero and are missing otherwise
+    starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+    missing = np.isnan(values)
+    empty = np.nan
+    if method in ("mean", "sum"):
+        reduced = np.add.reduceat(np.where(missing, 0, values), starts, axis=0)
+        if method == "mean":
+            counts = np.add.reduceat((~missing).astype(np.int64), starts, axis=0)
+            reduced = np.divide(reduced, counts, out=np.full(reduced.shape, np.nan, dtype=reduced.dtype), where=counts > 0)
+        else:
+            empty = 0
+    elif method == "min":
+        reduced = np.fmin.reduceat(values, starts, axis=0)
+    elif method == "max":
+        reduced = np.fmax.reduceat(values, starts, axis=0)
+    else:
+        raise ValueError(f"Unknown aggregation method: {method}")
+    result = np.full((bin_count, values.shape[1]), empty, dtype=values.dtype)
+    result[positions[starts]] = reduced
+    return result
+
+
+def _reduce_blocks(blocks, method):
+    # Reduce the middle axis of a (bins, rows per bin, columns) array, ignoring missing values
+    if method == "mean":
+        counts = (~np.isnan(blocks)).sum(axis=1)
+        sums = np.nansum(blocks, axis=1)
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan, dtype=sums.dtype), where=counts > 0)
+    if method == "sum":
+        return np.nansum(blocks, axis=1)
+    if method == "min":
+        return np.fmin.reduce(blocks, axis=1)
+    if method == "max":
+        return np.fmax.reduce(blocks, axis=1)
+    raise ValueError(f"Unknown aggregation method: {method}")
+
+
+@profiled
+def resample_frame(df_read, target_frequency, aggregation="mean", origin=None):
+    """
+    Changes the time resolution of a DataFrame with a sorted, unique datetime index.
+
+    Upsampling (and regularising at the native resolution) interpolates between observations.
+    Downsampling aggregates all observations in each bin instead of picking one of them: the
+    mean suits power values (MW), the sum suits energy values (MWh). The bins follow local
+    midnight (see 'resample_bins'). When the bins have a fixed width, the index is regular and
+    the target is a multiple of the native interval, the values are reshaped into
+    (bins, rows per bin, columns) blocks and reduced in one NumPy call per method; otherwise
+    each run of rows in the same bin is reduced with 'ufunc.reduceat'.
+
+    Args:
+        df_read: pandas DataFrame
+            The DataFrame to resample.
+        target_frequency: pandas Timedelta
+            The target time resolution.
+        aggregation: str or dict
+            The aggregation used when downsampling ('mean', 'sum', 'min' or 'max'), either for
+            all columns or as a mapping from column name to method.
+        origin: pandas Timestamp or None
+            The local midnight the bins are counted from; defaults to the one of the first row.
+
+    Returns:
+        pandas DataFrame: The resampled DataFrame.
+    """
+    target_frequency = pd.Timedelta(target_frequency)
+    index = df_read.index
+    native_frequency = infer_native_frequency(index)
+
+    if pd.isna(native_frequency) or target_frequency <= native_frequency:
+        if origin is None:
+            origin = local_midnight(index[0]) if len(index) else "start_day"
+        return df_read.resample(target_frequency, origin=origin).interpolate()
+
+    methods = aggregation if isinstance(aggregation, dict) else dict.fromkeys(df_read.columns, aggregation)
+    rows_per_bin, remainder = divmod(target_frequency.value, native_frequency.value)
+    span = (index[-1] - index[0]).value
+    is_regular = span == native_frequency.value * (len(index) - 1)
+    bins, fixed_width = resample_bins(index[0], index[-1], target_frequency, origin)
+    values = df_read.to_numpy(dtype=np.result_type(np.float32, *df_read.dtypes))
+
+    if remainder or not is_regular or not fixed_width:
+        positions = np.searchsorted(bins.asi8, index.asi8, side="right") - 1
+        reduced = np.empty((len(bins), values.shape[1]), dtype=values.dtype)
+        for method in set(methods.values()):
+            columns = [position for position, column in enumerate(df_read.columns) if methods[column] == method]
+            reduced[:, columns] = _reduce_bins(values[:, columns], positions, len(bins), method)
+        return pd.DataFrame(reduced, index=bins.rename(index.name), columns=df_read.columns, copy=False)
+
+    first_bin = bins[0]
+    leading_rows = (index[0] - first_bin) // native_frequency
+    bin_count = -(-(leading_rows + len(index)) // rows_per_bin)
 
-def process_time_resolution_and_duplicates(df_read, time_column, time_resolution_number, time_resolution_unit, skip_invalid_row, first_invalid_row_time):
+    padded = np.full((bin_count * rows_per_bin, values.shape[1]), np.nan, dtype=values.dtype)
+    padded[leading_rows:leading_rows + len(index)] = values
+    blocks = padded.reshape(bin_count, rows_per_bin, values.shape[1])
+
+    reduced = np.empty((bin_count, values.shape[1]), dtype=values.dtype)
+    for method in set(methods.values()):
+        positions = [position for position, column in enumerate(df_read.columns) if methods[column] == method]
+        reduced[:, positions] = _reduce_blocks(blocks[:, :, positions], method)
+
+    bin_index = pd.date_range(first_bin, periods=bin_count, freq=target_frequency, name=index.name)
+    return pd.DataFrame(reduced, index=bin_index, columns=df_read.columns, copy=False)
+
+
+def prepare_time_index(df_read, time_column, skip_invalid_row, first_invalid_row_time):
+    """
+    Indexes the DataFrame by its time column, sorted and without duplicates, trimmed before the
+    first invalid row and with numeric columns only, ready for resampling.
+
+    Args:
+        df_read: pandas DataFrame
+            The DataFrame to be prepared; it is left unchanged.
+        time_column: str
+            The name of the column containing time data.
+        skip_invalid_row: bool
+            Flag indicating whether to skip processing the invalid row.
+        first_invalid_row_time: datetime
+            The time of the first invalid row, used to trim the DataFrame.
+
+    Returns:
+        pandas DataFrame: The DataFrame indexed by time.
+    """
+    df_read = df_read.set_index(time_column)
+
+    # Handle duplicates. A UTC index has no repeated DST hour, so for sorted data this
+    # is answered by the monotonic check without a separate duplicate scan
+    if not df_read.index.is_monotonic_increasing:
+        df_read = df_read.sort_index(kind="stable")
+    if not df_read.index.is_unique:
+        df_read = df_read[~df_read.index.duplicated()]
+
+    # Keep only the rows until the row before the first_invalid_row
+    if skip_invalid_row == "False" and not pd.isna(first_invalid_row_time):
+        native_frequency = infer_native_frequency(df_read.index)
+        df_read = df_read.loc[:first_invalid_row_time - native_frequency]
+
+    # Convert any remaining non-numeric columns to numeric data types
+    non_numeric = [column for column in df_read.columns if not pd.api.types.is_numeric_dtype(df_read[column])]
+    if non_numeric:
+        df_read[non_numeric] = df_read[non_numeric].apply(pd.to_numeric, errors="coerce")
+    return df_read
+
+
+@profiled
+def process_time_resolution_and_duplicates(df_read, time_column, time_resolution_number, time_resolution_unit, skip_invalid_row, first_invalid_row_time, aggregation="mean", rollups=None, origin=None):
     """
     Processes the DataFrame by setting time resolution, handling duplicates, and resampling.
 
     This function converts the selected time resolution to minutes, sets a specified time column as the index,
-    and handles any potential duplicate index values. It then resamples the DataFrame based on the time resolution, 
-    interpolating as necessary.
+    and handles any potential duplicate index values. It then resamples the DataFrame based on the time resolution,
+    interpolating when upsampling and aggregating when downsampling (see 'resample_frame').
 
     Args:
         df_read: pandas DataFrame
@@ -162,6 +1152,15 @@ def process_time_resolution_and_duplicates(df_read, time_column, time_resolution
             Flag indicating whether to skip processing the invalid row.
         first_invalid_row_time: datetime
             The time of the first invalid row, used to trim the DataFrame.
+        aggregation: str or dict
+            How values are combined when downsampling: 'mean', 'sum', 'min' or 'max', for all
+            columns or per column.
+        rollups: RollupPyramid or None
+            The rollups of the same data (see 'subs.rollup.build_rollups'); whole-hour target
+            resolutions are then read from their hourly level instead of the native rows.
+        origin: pandas Timestamp or None
+            The local midnight the bins are counted from (see 'resample_bins'); defaults to the
+            one of the first row.
 
     Returns:
         pandas DataFrame: The processed DataFrame after resampling and handling duplicates.
@@ -169,61 +1168,55 @@ def process_time_resolution_and_duplicates(df_read, time_column, time_resolution
 
     # Convert the selected time resolution to minutes
     time_resolution_minutes = time_resolution_number * (60 if time_resolution_unit == "hours" else 1)
+    target_frequency = pd.Timedelta(minutes=time_resolution_minutes)
 
-    # Set the 'time_column' as the index explicitly
-    df_read.set_index(time_column, inplace=True)
+    if rollups is not None:
+        df_rolled = rollups.resample(target_frequency, aggregation, origin)
+        if df_rolled is not None:
+            return df_rolled
 
-    # Find the dataset frequency
-    difference = df_read.index.to_series().diff()[1]
-    minutes_difference = difference.total_seconds() / 60
+    # Set the 'time_column' as the index, sorted, deduplicated, trimmed and numeric
+    df_read = prepare_time_index(df_read, time_column, skip_invalid_row, first_invalid_row_time)
 
-    # Keep only the rows until the row before the first_invalid_row
-    if not skip_invalid_row:
-        df_read = df_read.loc[:first_invalid_row_time - pd.Timedelta(minutes=minutes_difference)]
-
-    # Handle duplicates
-    df_read = df_read[~df_read.index.duplicated()]
-
-    # Convert columns to numeric data types
-    df_read = df_read.apply(pd.to_numeric, errors="coerce")
-
-    # Resample and interpolate the DataFrame based on the time resolution
-    df_read = df_read.resample(f"{time_resolution_minutes}T").interpolate()
+    # Resample the DataFrame based on the time resolution
+    df_read = resample_frame(df_read, target_frequency, aggregation, origin)
 
     return df_read
 
 
-def display_column_statistics(df_read):
+@profiled
+def compute_column_statistics(df_read):
     """
-    Computes and displays descriptive statistics for each column in the DataFrame.
+    Computes descriptive statistics (count, mean, standard deviation, minimum, quartiles and
+    maximum) for every column of the DataFrame.
 
-    This function iterates through each column of the DataFrame and calculates descriptive statistics
-    such as count, mean, standard deviation, minimum, percentiles, and maximum. It then formats these
-    statistics into a markdown string for better readability and displays them using Streamlit.
+    All columns are reduced together on one 2-D float array, and the three quartiles come from a
+    single partial sort per column instead of one full sort per statistic. The result has the
+    same layout as 'DataFrame.describe()'.
 
     Args:
         df_read: pandas DataFrame
-            The DataFrame for which descriptive statistics are to be computed and displayed.
-    """
-
-    for column in df_read.columns:
-        # Compute descriptive statistics for the current column
-        stats = df_read[column].describe()
-
-        # Construct the summary text with markdown formatting
-        summary_text = f"""
-        ### Statistics for {column}
-        **Count**: {stats['count']} data points.\n
-        **Mean**: The average is {stats['mean']:.2f}.\n
-        **Standard Deviation**: The standard deviation is {stats['std']:.2f}, which indicates variability.\n
-        **Minimum**: The smallest observed value is {stats['min']:.2f}.\n
-        **25th Percentile**: 25% of the values are {stats['25%']:.2f} or less.\n
-        **50th Percentile (Median)**: The median value is {stats['50%']:.2f}.\n
-        **75th Percentile**: 75% of the values are {stats['75%']:.2f} or less.\n
-        **Maximum**: The largest observed value is {stats['max']:.2f}.
-        """
-
-        # Display the summary using Streamlit's markdown function
-        st.markdown(summary_text)
-
-        
\ No newline at end of file
+            The DataFrame for which descriptive statistics are to be computed.
+
+    Returns:
+        pandas DataFrame: The statistics, one column per column of 'df_read'.
+    """
+    values = df_read.to_numpy(dtype=np.float64)
+    counts = (~np.isnan(values)).sum(axis=0)
+    statistics = np.full((8, values.shape[1]), np.nan)
+    statistics[0] = counts
+
+    has_values = counts > 0
+    if has_values.any():
+        present = values[:, has_values]
+        statistics[1, has_values] = np.nanmean(present, axis=0)
+        if (counts > 1).any():
+            several = counts > 1
+            statistics[2, several] = np.nanstd(values[:, several], axis=0, ddof=1)
+        statistics[3, has_values] = np.nanmin(present, axis=0)
+        statistics[4:7, has_values] = np.nanquantile(present, [0.25, 0.5, 0.75], axis=0)
+        statistics[7, has_values] = np.nanmax(present, axis=0)
+
+    return pd.DataFrame(
+        statistics, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"], columns=df_read.columns
+    )
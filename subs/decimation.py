@@ -0,0 +1,135 @@
+# decimation.py
+import numpy as np
+import pandas as pd
+
+# Roughly the pixel width of a full-width chart; traces are reduced to about this many points
+DEFAULT_MAX_POINTS = 2000
+
+
+def minmax_indices(y, n_out):
+    """
+    Selects the positions of the minimum and maximum of 'y' in each of n_out / 2 equal buckets.
+
+    Every local peak and trough survives, so the reduced trace has the same envelope as the
+    original one. The buckets are built by reshaping the padded array, so the whole selection
+    is a single vectorized reduction.
+
+    Args:
+        y: numpy array
+            The values, without missing values.
+        n_out: int
+            The approximate number of points to keep.
+
+    Returns:
+        numpy array: The sorted positions of the points to keep.
+    """
+    n = len(y)
+    bucket_count = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+
+    bucket_size = -(-n // bucket_count)
+    padded_length = bucket_count * bucket_size
+    lows = np.full(padded_length, np.inf)
+    highs = np.full(padded_length, -np.inf)
+    lows[:n] = y
+    highs[:n] = y
+
+    offsets = np.arange(bucket_count) * bucket_size
+    minima = offsets + lows.reshape(bucket_count, bucket_size).argmin(axis=1)
+    maxima = offsets + highs.reshape(bucket_count, bucket_size).argmax(axis=1)
+    indices = np.unique(np.concatenate([minima, maxima, [0, n - 1]]))
+    return indices[indices < n]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Selects points with the largest-triangle-three-buckets algorithm.
+
+    The first and last points are always kept. Every bucket in between keeps the point that forms
+    the largest triangle with the point kept in the previous bucket and the average of the next
+    bucket, which preserves the visual shape of the trace.
+
+    Args:
+        x: numpy array
+            The x values as numbers (e.g. int64 nanoseconds for timestamps), sorted ascending.
+        y: numpy array
+            The values, without missing values.
+        n_out: int
+            The number of points to keep.
+
+    Returns:
+        numpy array: The sorted positions of the points to keep.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    bucket_starts, bucket_ends = edges[:-1], edges[1:]
+
+    # Averages of every bucket (and the final point, which acts as the bucket after the last one)
+    counts = np.maximum(bucket_ends - bucket_starts, 1)
+    average_x = np.append(np.add.reduceat(x[:-1], bucket_starts) / counts, x[-1])
+    average_y = np.append(np.add.reduceat(y[:-1], bucket_starts) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(bucket_starts, bucket_ends)):
+        end = max(end, start + 1)
+        areas = np.abs(
+            (x[previous] - average_x[bucket + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def decimate_series(series, max_points=DEFAULT_MAX_POINTS, method="minmax"):
+    """
+    Reduces a time series to about 'max_points' points for plotting.
+
+    Missing values are skipped when choosing the points, but one of them is kept wherever the
+    original series has a gap between two kept points, so the line still breaks at the gap
+    instead of being drawn across it.
+
+    Args:
+        series: pandas Series
+            The series to reduce, indexed by time.
+        max_points: int or None
+            The approximate number of points to keep; None keeps every point.
+        method: str
+            'minmax' (keeps every peak) or 'lttb' (keeps the visual shape).
+
+    Returns:
+        pandas Series: The reduced series.
+    """
+    if max_points is None or len(series) <= max_points:
+        return series
+
+    y = series.to_numpy(dtype=np.float64)
+    missing = np.isnan(y)
+    present = np.flatnonzero(~missing)
+    if method == "lttb":
+        if isinstance(series.index, pd.DatetimeIndex):
+            x = series.index.asi8
+        else:
+            x = np.arange(len(series))
+        indices = present[lttb_indices(x[present], y[present], max_points)]
+    elif method == "minmax":
+        indices = present[minmax_indices(y[present], max_points)]
+    else:
+        raise ValueError(f"Unknown decimation method: {method}")
+
+    if missing.any() and len(indices) > 1:
+        # Keep the first missing value after every kept point that is followed by a gap
+        missing_before = np.cumsum(missing)
+        has_gap = missing_before[indices[1:]] > missing_before[indices[:-1]]
+        gaps = np.flatnonzero(missing)
+        breaks = gaps[np.searchsorted(gaps, indices[:-1][has_gap])]
+        indices = np.union1d(indices, breaks)
+    return series.iloc[indices]
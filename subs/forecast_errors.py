@@ -0,0 +1,181 @@
+# forecast_errors.py
+import re
+
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.data_loader import to_local_time, extract_area_code
+
+# Words that mark a forecast or an actual column in ENTSO-E headers, e.g.
+# "Day-ahead Total Load Forecast [MW] - Germany (DE)" and "Actual Total Load [MW] - Germany (DE)"
+FORECAST_PATTERN = re.compile(r"\b(?:(?:day|week|month|year)-ahead\b|forecast\b)", re.IGNORECASE)
+ACTUAL_PATTERN = re.compile(r"\bactual\b", re.IGNORECASE)
+# Quantiles of the forecast error reported for every profile group
+ERROR_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Calendar profiles: name, function of the local time index giving group codes, group labels
+PROFILES = {
+    "hour": (lambda index: index.hour, list(range(24))),
+    "weekday": (lambda index: index.weekday, ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]),
+    "month": (lambda index: index.month - 1, ["January", "February", "March", "April", "May", "June", "July",
+                                               "August", "September", "October", "November", "December"]),
+}
+
+
+def _measure_key(column, pattern):
+    # The header without its forecast/actual words, used to match the two sides of a pair
+    return " ".join(pattern.sub(" ", str(column)).split()).lower()
+
+
+def pair_forecast_columns(columns):
+    """
+    Pairs every forecast column with the actual column of the same measure and area.
+
+    Headers are matched after removing the words that mark them as a forecast ("Day-ahead",
+    "Forecast", ...) or an actual ("Actual"), so "Day-ahead Total Load Forecast [MW] - Germany (DE)"
+    pairs with "Actual Total Load [MW] - Germany (DE)".
+
+    Args:
+        columns: list of str
+            The column headers.
+
+    Returns:
+        list of dict: One entry per pair with the 'forecast' and 'actual' column, the 'area' code
+        and a 'label' (the actual header without "Actual").
+    """
+    actuals = {}
+    for column in columns:
+        if ACTUAL_PATTERN.search(str(column)) and not FORECAST_PATTERN.search(str(column)):
+            actuals.setdefault(_measure_key(column, ACTUAL_PATTERN), column)
+
+    pairs = []
+    for column in columns:
+        if not FORECAST_PATTERN.search(str(column)) or ACTUAL_PATTERN.search(str(column)):
+            continue
+        actual = actuals.get(_measure_key(column, FORECAST_PATTERN))
+        if actual is not None:
+            pairs.append({
+                "forecast": column,
+                "actual": actual,
+                "area": extract_area_code(actual),
+                "label": " ".join(ACTUAL_PATTERN.sub(" ", str(actual)).split()),
+            })
+    return pairs
+
+
+def _group_quantiles(errors, groups, group_count, quantiles):
+    """
+    Computes quantiles of 'errors' for every group in a single sort.
+
+    The values are sorted by (group, error) at once; missing values sort to the end of their
+    group. Each quantile is then read from the sorted array at its position within the group,
+    with linear interpolation as in 'numpy.quantile'.
+
+    Returns:
+        numpy array: The quantiles, shape (group_count, len(quantiles)); NaN for empty groups.
+    """
+    if len(errors) == 0:
+        return np.full((group_count, len(quantiles)), np.nan)
+    order = np.lexsort((errors, groups))
+    sorted_errors = errors[order]
+    group_sizes = np.bincount(groups, minlength=group_count)
+    valid_counts = np.bincount(groups[~np.isnan(errors)], minlength=group_count)
+    group_starts = np.concatenate([[0], np.cumsum(group_sizes)[:-1]])
+
+    positions = np.asarray(quantiles)[None, :] * np.maximum(valid_counts - 1, 0)[:, None]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(valid_counts - 1, 0)[:, None])
+    weight = positions - lower
+    lower_values = sorted_errors[np.minimum(group_starts[:, None] + lower, len(sorted_errors) - 1)]
+    upper_values = sorted_errors[np.minimum(group_starts[:, None] + upper, len(sorted_errors) - 1)]
+    result = lower_values + (upper_values - lower_values) * weight
+    result[valid_counts == 0] = np.nan
+    return result
+
+
+def _error_metrics(errors, actuals, groups, group_count):
+    # Count, MAE, RMSE, MAPE and bias for every group, from a handful of bincounts
+    valid = ~np.isnan(errors)
+    valid_groups = groups[valid]
+    valid_errors = errors[valid]
+    counts = np.bincount(valid_groups, minlength=group_count)
+    sums = np.bincount(valid_groups, valid_errors, minlength=group_count)
+    absolute_sums = np.bincount(valid_groups, np.abs(valid_errors), minlength=group_count)
+    squared_sums = np.bincount(valid_groups, valid_errors ** 2, minlength=group_count)
+
+    # Percentage errors are only defined where the actual value is not zero
+    valid_actuals = np.abs(actuals[valid])
+    relative = valid_actuals > 0
+    percentage_sums = np.bincount(
+        valid_groups[relative], np.abs(valid_errors[relative]) / valid_actuals[relative], minlength=group_count
+    )
+    percentage_counts = np.bincount(valid_groups[relative], minlength=group_count)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "count": counts,
+            "MAE": absolute_sums / counts,
+            "RMSE": np.sqrt(squared_sums / counts),
+            "MAPE": 100 * percentage_sums / percentage_counts,
+            "bias": sums / counts,
+        }
+
+
+@profiled
+def compute_forecast_errors(df_read, quantiles=ERROR_QUANTILES):
+    """
+    Computes forecast error metrics for every forecast/actual pair found in the column headers.
+
+    The error is forecast minus actual, so a positive bias means over-forecasting. All pairs are
+    stacked into one (rows x pairs) error array, and every metric is computed for all pairs and
+    all calendar groups together: sums come from 'numpy.bincount' over combined (pair, group)
+    codes and quantiles from one sort per profile (see '_group_quantiles'). Calendar groups use
+    local time, like the rest of the Trend Analysis page.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame indexed by time.
+        quantiles: tuple of float
+            The error quantiles to report.
+
+    Returns:
+        dict: 'pairs' (the list from 'pair_forecast_columns'), 'summary' (one row per pair with
+        count, MAE, RMSE, MAPE in %, bias and the error quantiles) and, for each of 'hour',
+        'weekday' and 'month', the same metrics with a (pair label, group) row index. The
+        DataFrames are empty if no pairs are found.
+    """
+    pairs = pair_forecast_columns(df_read.columns)
+    labels = [pair["label"] for pair in pairs]
+    quantile_columns = [f"q{round(quantile * 100):02d}" for quantile in quantiles]
+    metric_columns = ["count", "MAE", "RMSE", "MAPE", "bias"] + quantile_columns
+    result = {"pairs": pairs, "summary": pd.DataFrame(columns=metric_columns, index=pd.Index(labels, name="pair"))}
+    for name in PROFILES:
+        result[name] = pd.DataFrame(columns=metric_columns, index=pd.MultiIndex.from_arrays([[], []], names=["pair", name]))
+    if not pairs:
+        return result
+
+    forecasts = df_read[[pair["forecast"] for pair in pairs]].to_numpy(dtype=np.float64)
+    actuals = df_read[[pair["actual"] for pair in pairs]].to_numpy(dtype=np.float64)
+    errors = (forecasts - actuals).ravel(order="F")
+    actuals = actuals.ravel(order="F")
+    row_count, pair_count = forecasts.shape
+    pair_codes = np.repeat(np.arange(pair_count), row_count)
+
+    def table(groups, group_count):
+        metrics = _error_metrics(errors, actuals, groups, group_count)
+        frame = pd.DataFrame(metrics)
+        frame[quantile_columns] = _group_quantiles(errors, groups, group_count, quantiles)
+        return frame
+
+    summary = table(pair_codes, pair_count)
+    summary.index = pd.Index(labels, name="pair")
+    result["summary"] = summary
+
+    local_index = to_local_time(df_read).index
+    for name, (group_of, group_labels) in PROFILES.items():
+        group_count = len(group_labels)
+        calendar_codes = np.tile(np.asarray(group_of(local_index), dtype=np.int64), pair_count)
+        profile = table(pair_codes * group_count + calendar_codes, pair_count * group_count)
+        profile.index = pd.MultiIndex.from_product([labels, group_labels], names=["pair", name])
+        result[name] = profile
+    return result
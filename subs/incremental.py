@@ -0,0 +1,197 @@
+# incremental.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.merge import load_export
+from subs.data_loader import (
+    load_processed,
+    save_processed,
+    process_uploaded_file,
+    process_time_resolution_and_duplicates,
+    local_midnight,
+    resample_bins,
+)
+
+# Suffix of the file that holds the state of an incrementally updated output
+STATE_SUFFIX = ".state.arrow"
+# Version of the state layout; states of another version are rebuilt from scratch. Version 2
+# aligns the bins to local midnight instead of UTC midnight
+STATE_VERSION = 2
+# Rows before the previous run's last timestamp that are parsed again, as an overlap check
+OVERLAP_ROWS = 200
+# The seasonal fill looks a local week back, up to a week and an hour in UTC over a DST change,
+# so that much raw data is kept before the open gaps
+SEASONAL_CONTEXT = pd.Timedelta(weeks=1, hours=1)
+
+
+def state_path_for(output_path):
+    """
+    Returns the path of the state file kept next to an incrementally updated output file.
+    """
+    return os.fspath(output_path) + STATE_SUFFIX
+
+
+def _write_atomically(df_read, path, metadata):
+    # Write next to the target and rename, so a reader never sees a half-written file
+    file_format = "parquet" if path.endswith(".parquet") else "arrow"
+    partial_path = f"{path}.{os.getpid()}.partial"
+    save_processed(df_read, partial_path, file_format, metadata)
+    os.replace(partial_path, path)
+
+
+def _align_to_bins(time, target_frequency, origin):
+    # Start of the output bin holding 'time'; every run resamples from the same origin (local
+    # midnight of the full run's first day), so this bin is also a bin of the later runs
+    return max(resample_bins(time, time, target_frequency, origin)[0][0], origin)
+
+
+def _last_observed(observed):
+    # Position of the last True of every column that has one, counted from the top
+    has_observation = observed.any(axis=0)
+    return len(observed) - 1 - observed[::-1, has_observation].argmax(axis=0)
+
+
+def _tail_bounds(raw, missing_values, target_frequency, origin):
+    """
+    Finds the raw rows that a later run has to process again, and the output it has to rebuild.
+
+    Values after the last observation of a column were filled without knowing the next one
+    (interpolation, forward filling, gap lengths), so they are recomputed once new rows arrive.
+    The rebuild starts at the output bin that holds the earliest of these last observations, so
+    the last, possibly incomplete, bin is rebuilt whole. The raw rows are kept from the last
+    observation of every column before that bin (the last complete row for 'Remove'), so each
+    rebuilt value is filled from the same neighbours as in a full run; the seasonal fill also
+    reads the week before. Columns without any observation in 'raw' are ignored.
+
+    Returns:
+        pandas Timestamp: The first raw row to keep.
+        pandas Timestamp: The first output bin to rebuild.
+    """
+    observed = ~np.isnan(raw.to_numpy(dtype=np.float64))
+    if not observed.any():
+        start = _align_to_bins(raw.index[0], target_frequency, origin)
+        return start, start
+    rebuild_start = _align_to_bins(raw.index[_last_observed(observed).min()], target_frequency, origin)
+
+    observed = observed[:raw.index.searchsorted(rebuild_start, side="right")]
+    if missing_values == "Remove":
+        observed = observed.all(axis=1, keepdims=True)
+    anchor = raw.index[_last_observed(observed).min()] if observed.any() else raw.index[0]
+    if missing_values == "Seasonal (Previous Week)":
+        anchor -= SEASONAL_CONTEXT
+    return _align_to_bins(anchor, target_frequency, origin), rebuild_start
+
+
+@profiled
+def update_incremental(source, output_path, state_path=None, time_column=None, missing_values="Interpolate",
+                       max_gap=None, time_resolution_number=15, time_resolution_unit="minutes", aggregation="mean"):
+    """
+    Brings a processed output file up to date with a newer download of the same export.
+
+    ENTSO-E exports of the current year are re-downloaded as they fill up ("-" marks the periods
+    not published yet). Instead of reprocessing the whole file, only the rows after the last
+    timestamp of the previous run are parsed, cleaned and resampled, together with the short raw
+    tail kept in the state file (see '_tail_bounds'), and the result replaces the end of the
+    output. Rows up to the previous run's last timestamp are not read again, so revisions of
+    older values need a full rebuild: delete the state file, or change any processing option.
+    CSV and .xlsx exports skip the old rows without parsing them.
+
+    Args:
+        source: str, path or file-like object
+            The latest download of the export.
+        output_path: str
+            The processed '.parquet' or '.arrow' file to create or update.
+        state_path: str
+            The state file; defaults to the output path plus '.state.arrow'.
+        time_column: str
+            The column with date and time observations. Defaults to the first column.
+        missing_values: str
+            The method for handling missing values, one of MISSING_VALUE_OPTIONS.
+        max_gap: int or None
+            The longest gap (in rows) that is filled; None fills gaps of any length.
+        time_resolution_number: int
+            The numeric part of the target time resolution.
+        time_resolution_unit: str
+            The unit of the target time resolution ('minutes' or 'hours').
+        aggregation: str
+            How values are combined when downsampling ('mean', 'sum', 'min' or 'max').
+
+    Returns:
+        pandas DataFrame: The complete processed DataFrame indexed by UTC time.
+        int: The number of new source rows that were processed.
+    """
+    output_path = os.fspath(output_path)
+    state_path = state_path_for(output_path) if state_path is None else state_path
+    options = {
+        "time_column": time_column,
+        "missing_values": missing_values,
+        "max_gap": max_gap,
+        "time_resolution_number": time_resolution_number,
+        "time_resolution_unit": time_resolution_unit,
+        "aggregation": aggregation,
+    }
+    target_frequency = pd.Timedelta(
+        minutes=time_resolution_number * (60 if time_resolution_unit == "hours" else 1)
+    )
+
+    previous = None
+    if os.path.exists(output_path) and os.path.exists(state_path):
+        tail = load_processed(state_path)
+        state = tail.attrs["entsoe"]
+        if state.get("version") == STATE_VERSION and state.get("options") == options:
+            # Only the rows from shortly before the previous run's last timestamp are parsed. The
+            # file has at least 'source_rows' rows up to that timestamp (placeholder rows of the
+            # skipped spring hour are dropped while loading, never added)
+            source_end = pd.Timestamp(state["source_end"])
+            raw = load_export(source, time_column, skip_rows=max(state["source_rows"] - OVERLAP_ROWS, 0))
+            # The previous last row must be among the parsed rows, with the same columns,
+            # otherwise the file is not a newer download of the same export
+            if list(tail.columns) == list(raw.columns) and source_end in raw.index:
+                previous = load_processed(output_path)
+
+    if previous is None:
+        # First run, changed options or a different export: process everything
+        raw = load_export(source, time_column)
+        work = raw
+        origin = local_midnight(raw.index[0])
+        source_rows = len(raw)
+    else:
+        origin = pd.Timestamp(state["origin"])
+        new_rows = raw[raw.index > source_end]
+        if new_rows.empty:
+            return previous, 0
+        tail.attrs = {}
+        work = pd.concat([tail, new_rows.astype(tail.dtypes.to_dict())])
+        source_rows = state["source_rows"] + len(new_rows)
+    time_column = raw.index.name
+    new_row_count = len(work) - (0 if previous is None else len(tail))
+
+    cleaned, _ = process_uploaded_file(work.reset_index(), missing_values, max_gap)
+    appended = process_time_resolution_and_duplicates(
+        cleaned, time_column, time_resolution_number, time_resolution_unit, "True", np.nan, aggregation,
+        origin=origin,
+    )
+    if previous is None:
+        df_read = appended
+    else:
+        rebuild_start = pd.Timestamp(state["rebuild_start"])
+        df_read = pd.concat([previous[previous.index < rebuild_start], appended[appended.index >= rebuild_start]])
+        df_read.attrs = {}
+
+    source_name = os.path.basename(os.fspath(source)) if isinstance(source, (str, os.PathLike)) else source.name
+    _write_atomically(df_read, output_path, {"source_file": source_name, **options})
+    keep_start, rebuild_start = _tail_bounds(work, missing_values, target_frequency, origin)
+    state = {
+        "version": STATE_VERSION,
+        "source_end": work.index[-1].isoformat(),
+        "source_rows": source_rows,
+        "origin": origin.isoformat(),
+        "rebuild_start": rebuild_start.isoformat(),
+        "options": options,
+    }
+    next_tail = work[work.index >= keep_start]
+    _write_atomically(next_tail, state_path, state)
+    return df_read, new_row_count
@@ -0,0 +1,276 @@
+# jobs.py
+import functools
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from subs.cache import frame_cache
+from subs.profiling import start_run, get_run_records, set_stage_listener, get_thread_context, set_thread_context
+
+# Worker threads shared by the background jobs of every Streamlit session
+JOB_WORKERS = int(os.environ.get("ENTSOE_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a background job when it has been cancelled, to stop it at the next checkpoint."""
+
+
+def report_progress(fraction=None, message=None):
+    """
+    Reports the progress of the background job running in the current thread.
+
+    Long stages call this between chunks. It is also the point where a cancelled job stops, so
+    it should be called between units of work, never in the middle of updating shared state.
+    Outside a background job it does nothing.
+
+    Args:
+        fraction: float or None
+            The completed fraction of the current stage, between 0 and 1, if it is known.
+        message: str or None
+            A short description of the progress, e.g. the number of rows parsed.
+
+    Raises:
+        JobCancelled: If the job has been cancelled.
+    """
+    job = getattr(_local, "job", None)
+    if job is None:
+        return
+    if job.cancel_requested:
+        raise JobCancelled(job.key)
+    if fraction is not None:
+        job.progress = min(max(float(fraction), 0.0), 1.0)
+    if message is not None:
+        job.message = message
+
+
+def in_current_job(func):
+    """
+    Wraps 'func' to run in a helper thread as part of the current thread's job and profiling run.
+
+    Threads do not inherit the job of the thread that starts them, so without this a stage run on
+    a helper thread (e.g. one file of a merge) would not report progress, would not stop when the
+    job is cancelled and would not show up in the job's records.
+
+    Args:
+        func: callable
+            The function to run on helper threads.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    job = getattr(_local, "job", None)
+    context = get_thread_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous_job, previous_context = getattr(_local, "job", None), get_thread_context()
+        _local.job = job
+        set_thread_context(context)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.job = previous_job
+            set_thread_context(previous_context)
+    return wrapper
+
+
+def _private_copy(value):
+    # Uploads are read with seek/read, so a job gets its own file object over the same bytes
+    # and the session can keep reading the upload while the job parses it
+    if isinstance(value, (list, tuple)):
+        return type(value)(_private_copy(item) for item in value)
+    if hasattr(value, "getvalue"):
+        copy = io.BytesIO(value.getvalue())
+        copy.name = getattr(value, "name", None)
+        return copy
+    return value
+
+
+class Job:
+    """
+    One pipeline stage running on the shared worker pool.
+
+    The stage's result is published to the frame cache under the job's key when it finishes.
+    'status' is one of 'queued', 'running', 'done', 'failed' or 'cancelled'; 'stages' lists the
+    profiled calls it is in, outermost first, and 'progress' and 'message' hold the last values
+    passed to 'report_progress'. 'records' holds the profiling records of the stages it ran, for
+    the performance panel of the session waiting for it.
+    """
+
+    def __init__(self, key, func, args, kwargs, cache, track_memory=False):
+        self.key = key
+        self.name = getattr(func, "__name__", "stage")
+        self.status = "queued"
+        self.stages = []
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.records = []
+        self.owners = set()
+        self.track_memory = track_memory
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._cache = cache
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Waits until the job has finished, at most 'timeout' seconds.
+
+        Returns:
+            bool: Whether the job has finished.
+        """
+        return self._finished.wait(timeout)
+
+    def cancel(self):
+        """
+        Asks the job to stop. A queued job never starts; a running one stops at its next checkpoint.
+        """
+        self._cancel.set()
+
+    def describe(self):
+        """
+        Returns a one-line description of the current stage and progress, e.g. for a progress bar.
+        """
+        stages = " › ".join(self.stages) or self.name
+        return f"{stages}: {self.message}" if self.message else stages
+
+    def _enter_stage(self, stage, entering):
+        # Stage listener of the worker thread: every profiled call is a checkpoint as well
+        if entering:
+            if self.cancel_requested:
+                raise JobCancelled(self.key)
+            self.stages.append(stage)
+        elif stage in self.stages:
+            # Helper threads of the job (see 'in_current_job') enter and leave stages concurrently,
+            # so the stage is removed by name rather than from the top
+            del self.stages[len(self.stages) - 1 - self.stages[::-1].index(stage)]
+
+    def _run(self):
+        if self.cancel_requested:
+            self._finish("cancelled")
+            return
+        self.status = "running"
+        _local.job = self
+        start_run(track_memory=self.track_memory)
+        set_stage_listener(self._enter_stage)
+        try:
+            # 'get_or_compute' stores the result in the cache and hands back one that the job owns
+            self.result = self._cache.get_or_compute(self.key, self._func, *self._args, **self._kwargs)
+            status = "done"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as error:
+            self.error = error
+            status = "failed"
+        finally:
+            _local.job = None
+            set_stage_listener(None)
+            self.records = get_run_records(as_list=True)
+            self._args = self._kwargs = None
+        self._finish(status)
+
+    def _finish(self, status):
+        self.status = status
+        if status == "done":
+            self.progress = 1.0
+        self._finished.set()
+
+
+class JobManager:
+    """
+    Runs pipeline stages as background jobs on a thread pool shared by all sessions.
+
+    Jobs are keyed like the frame cache: a stage that is requested again while it runs (by a
+    rerun of the same session or by another session with the same data) is served by the job
+    already running. Sessions register as owners of the jobs they wait for; a job that no owner
+    needs any more is cancelled instead of running to completion.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, cache=frame_cache):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="entsoe-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, owner=None, track_memory=False, **kwargs):
+        """
+        Returns the job computing 'func(*args, **kwargs)' for 'key', starting one if none is running.
+
+        Args:
+            key: str
+                The cache key of the result.
+            func: callable
+                The pipeline stage.
+            owner: hashable or None
+                The session waiting for the result.
+            track_memory: bool
+                Whether a new job measures the peak memory of its stages (see 'profiling.start_run').
+
+        Returns:
+            Job: The new or already running job.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.cancel_requested:
+                job = Job(key, func, _private_copy(args), _private_copy(kwargs), self.cache, track_memory)
+                self._jobs[key] = job
+                self._executor.submit(self._run, job)
+            if owner is not None:
+                job.owners.add(owner)
+        return job
+
+    def release(self, owner, keep=None):
+        """
+        Removes 'owner' from every unfinished job except 'keep', cancelling jobs left without owners.
+
+        A session calls this when it starts waiting for a job: any other job it still owns was
+        started for inputs that have changed since, so its result is no longer needed.
+
+        Returns:
+            int: The number of jobs cancelled.
+        """
+        cancelled = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if job is keep or owner not in job.owners:
+                    continue
+                job.owners.discard(owner)
+                if not job.owners and not job.finished:
+                    job.cancel()
+                    cancelled += 1
+        return cancelled
+
+    def running(self):
+        """
+        Returns the jobs that are queued or running.
+        """
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.finished]
+
+    def _run(self, job):
+        try:
+            job._run()
+        finally:
+            # Finished jobs are forgotten; their results live on in the cache
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+
+# Process-wide job manager shared by every Streamlit session
+job_manager = JobManager()
@@ -0,0 +1,151 @@
+# merge.py
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.jobs import report_progress, in_current_job
+from subs.data_loader import (
+    load_data,
+    load_data_streaming,
+    load_excel_streaming,
+    process_data_for_analysis,
+    convert_time,
+    extract_area_code,
+)
+
+# How often a merge waiting for its files checks whether its job has been cancelled
+CANCEL_CHECK_SECONDS = 0.05
+
+
+def _source_name(source):
+    return os.fspath(source) if isinstance(source, (str, os.PathLike)) else source.name
+
+
+@profiled
+def load_export(source, time_column=None, skip_rows=0):
+    """
+    Loads one ENTSO-E export into a frame indexed by UTC interval start, ready to be merged.
+
+    CSV and .xlsx files go through the streaming loaders; other files are loaded whole. Rows from the first
+    "-" (future periods that ENTSO-E has not filled yet) onwards are dropped, so they cannot
+    hide real values from another file covering the same period.
+
+    Args:
+        source: str, path or file-like object
+            The export file.
+        time_column: str
+            The name of the column with date and time observations. Defaults to the first column.
+        skip_rows: int
+            The number of leading data rows of a CSV or .xlsx file to skip without parsing them.
+
+    Returns:
+        pandas DataFrame: The values as float columns, indexed by UTC time.
+    """
+    if _source_name(source).lower().endswith(".csv"):
+        df_read, skip_invalid_row, first_invalid_row_time = load_data_streaming(source, time_column, skip_rows=skip_rows)
+        time_column = df_read.columns[0]
+    elif _source_name(source).lower().endswith(".xlsx"):
+        df_read, skip_invalid_row, first_invalid_row_time = load_excel_streaming(source, time_column=time_column, skip_rows=skip_rows)
+        time_column = df_read.columns[0]
+    else:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as export_file:
+                df_read = load_data(export_file)
+        else:
+            df_read = load_data(source)
+        time_column = df_read.columns[0] if time_column is None else time_column
+        df_read, skip_invalid_row, first_invalid_row_time = process_data_for_analysis(df_read, time_column)
+        df_read = convert_time(df_read, time_column)
+        df_read[df_read.columns[1:]] = df_read[df_read.columns[1:]].apply(pd.to_numeric, errors="coerce")
+
+    df_read = df_read.set_index(time_column)
+    if skip_invalid_row == "False" and not pd.isna(first_invalid_row_time):
+        df_read = df_read[df_read.index < first_invalid_row_time]
+    return df_read
+
+
+@profiled
+def merge_exports(sources, workers=None):
+    """
+    Stitches consecutive-year and multi-area ENTSO-E exports into one frame on a shared UTC index.
+
+    The files are parsed in parallel, on threads that report to the current job (see
+    'in_current_job'), so a cancelled merge stops while the files are still being read. Files with the same column headers (the same data for the
+    same area) are treated as consecutive periods: they are ordered by start time and
+    concatenated, and rows that appear in more than one file are kept once, from the later file.
+    The resulting per-area blocks are then outer-joined by writing them into a single array
+    allocated for the union of all timestamps, instead of repeated concat/merge copies.
+
+    Args:
+        sources: list of str, paths or file-like objects
+            The export files.
+        workers: int or None
+            The number of parsing threads; defaults to one per file (capped by the executor).
+
+    Returns:
+        pandas DataFrame: The merged data with the UTC time column first, as 'convert_time'
+        returns it. 'attrs["areas"]' maps every value column to its area code.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        load = in_current_job(load_export)
+        futures = [executor.submit(load, source) for source in sources]
+        frames = []
+        for future in futures:
+            # Wait in short steps, so a cancelled job stops here even while a file is being parsed
+            while True:
+                try:
+                    frames.append(future.result(timeout=CANCEL_CHECK_SECONDS))
+                    break
+                except FuturesTimeout:
+                    report_progress()
+            report_progress(len(frames) / len(sources), f"{len(frames)} of {len(sources)} files parsed")
+    finally:
+        # If the job is cancelled, files that have not started parsing are dropped, and the ones
+        # being parsed stop at their next checkpoint without the job waiting for them
+        executor.shutdown(wait=False, cancel_futures=True)
+    time_column = frames[0].index.name
+
+    # Group files that carry the same columns; they are consecutive periods of the same data
+    groups = {}
+    for frame in frames:
+        groups.setdefault(tuple(frame.columns), []).append(frame)
+
+    blocks = []
+    for group in groups.values():
+        group.sort(key=lambda frame: frame.index[0] if len(frame) else pd.Timestamp.max.tz_localize("UTC"))
+        block = pd.concat(group) if len(group) > 1 else group[0]
+        if len(group) > 1 and not block.index.is_unique:
+            block = block[~block.index.duplicated(keep="last")]
+        if not block.index.is_monotonic_increasing:
+            block = block.sort_index(kind="stable")
+        blocks.append(block)
+
+    # Union of all timestamps, then one allocation for every column of every area
+    union = blocks[0].index
+    for block in blocks[1:]:
+        union = union.union(block.index)
+    columns = list(dict.fromkeys(column for block in blocks for column in block.columns))
+    positions = {column: position for position, column in enumerate(columns)}
+    dtype = np.result_type(np.float32, *[dtype for block in blocks for dtype in block.dtypes])
+    values = np.full((len(union), len(columns)), np.nan, dtype=dtype)
+
+    for block in blocks:
+        rows = union.get_indexer(block.index)
+        block_values = block.to_numpy(dtype=dtype)
+        targets = [positions[column] for column in block.columns]
+        if len(set(targets)) == len(targets) and np.isnan(values[np.ix_(rows, targets)]).all():
+            values[np.ix_(rows, targets)] = block_values
+        else:
+            # A column shared with an earlier block: only fill in what is still missing
+            for offset, target in enumerate(targets):
+                current = values[rows, target]
+                values[rows, target] = np.where(np.isnan(block_values[:, offset]), current, block_values[:, offset])
+
+    merged = pd.DataFrame(values, columns=columns, copy=False)
+    merged.insert(0, time_column, union)
+    merged.attrs["areas"] = {column: extract_area_code(column) for column in columns}
+    return merged
@@ -0,0 +1,211 @@
+# pipeline.py
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from subs.data_loader import (
+    load_data,
+    load_data_streaming,
+    load_excel_streaming,
+    process_data_for_analysis,
+    process_uploaded_file,
+    convert_time,
+    process_time_resolution_and_duplicates,
+    compute_column_statistics,
+    save_processed,
+    MISSING_VALUE_OPTIONS,
+)
+from subs.incremental import update_incremental
+from subs.forecast_errors import compute_forecast_errors
+
+# File types picked up when a directory is given as input
+SUPPORTED_EXTENSIONS = (".csv", ".xls", ".xlsx")
+# Output formats and the file extension written for each
+OUTPUT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+
+def expand_inputs(inputs):
+    """
+    Expands a list of files, directories and glob patterns into a sorted list of export files.
+
+    Args:
+        inputs: list of str
+            Paths to files or directories, or glob patterns such as 'exports/*2023*.csv'.
+
+    Returns:
+        list of str: The matching files, without duplicates.
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(
+                os.path.join(item, name) for name in os.listdir(item) if name.lower().endswith(SUPPORTED_EXTENSIONS)
+            )
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            paths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def process_file(path, time_column=None, missing_values="Interpolate", max_gap=None,
+                 time_resolution_number=15, time_resolution_unit="minutes", aggregation="mean"):
+    """
+    Runs the full cleaning and resolution pipeline on one ENTSO-E export, without any UI.
+
+    CSV and .xlsx files go through the low-memory streaming loaders; .xls files are loaded whole. The steps
+    and options are the same as on the Data Manipulation page.
+
+    Args:
+        path: str
+            The export file to process.
+        time_column: str
+            The column with date and time observations. Defaults to the first column.
+        missing_values: str
+            The method for handling missing values, one of MISSING_VALUE_OPTIONS.
+        max_gap: int or None
+            The longest gap (in rows) that is filled; None fills gaps of any length.
+        time_resolution_number: int
+            The numeric part of the target time resolution.
+        time_resolution_unit: str
+            The unit of the target time resolution ('minutes' or 'hours').
+        aggregation: str
+            How values are combined when downsampling ('mean', 'sum', 'min' or 'max').
+
+    Returns:
+        pandas DataFrame: The processed DataFrame indexed by UTC time.
+        fill_report: pandas DataFrame
+            The per-column report of filled missing values.
+    """
+    if path.lower().endswith(".csv"):
+        df_read, skip_invalid_row, first_invalid_row_time = load_data_streaming(path, time_column)
+        time_column = df_read.columns[0]
+    elif path.lower().endswith(".xlsx"):
+        df_read, skip_invalid_row, first_invalid_row_time = load_excel_streaming(path, time_column=time_column)
+        time_column = df_read.columns[0]
+    else:
+        with open(path, "rb") as uploaded_file:
+            df_read = load_data(uploaded_file)
+        time_column = df_read.columns[0] if time_column is None else time_column
+        df_read, skip_invalid_row, first_invalid_row_time = process_data_for_analysis(df_read, time_column)
+
+    df_read = convert_time(df_read, time_column)
+    df_read, fill_report = process_uploaded_file(df_read, missing_values, max_gap)
+    df_read = process_time_resolution_and_duplicates(
+        df_read, time_column, time_resolution_number, time_resolution_unit,
+        skip_invalid_row, first_invalid_row_time, aggregation
+    )
+    return df_read, fill_report
+
+
+def _process_and_write(path, output_dir, output_format, statistics, incremental, options):
+    # Worker entry point: process one file and write its outputs
+    stem = os.path.splitext(os.path.basename(path))[0]
+    output_path = os.path.join(output_dir, stem + OUTPUT_EXTENSIONS[output_format])
+    if incremental:
+        # Only the rows added since the previous run are processed; this also writes the output
+        df_read, _ = update_incremental(path, output_path, **options)
+    elif output_format == "csv":
+        df_read, _ = process_file(path, **options)
+        df_read.to_csv(output_path)
+    else:
+        df_read, _ = process_file(path, **options)
+        metadata = {"source_file": os.path.basename(path), **options}
+        save_processed(df_read, output_path, output_format, metadata)
+    if statistics:
+        compute_column_statistics(df_read).to_csv(os.path.join(output_dir, f"{stem}_statistics.csv"))
+        errors = compute_forecast_errors(df_read)
+        if errors["pairs"]:
+            errors["summary"].to_csv(os.path.join(output_dir, f"{stem}_forecast_errors.csv"))
+            errors["hour"].to_csv(os.path.join(output_dir, f"{stem}_forecast_errors_by_hour.csv"))
+    return output_path
+
+
+def process_files(paths, output_dir, workers=None, output_format="csv", statistics=False, incremental=False, **options):
+    """
+    Processes many export files in parallel with a process pool and writes the results.
+
+    Args:
+        paths: list of str
+            The export files to process.
+        output_dir: str
+            The directory the processed files are written to.
+        workers: int or None
+            The number of worker processes; defaults to the number of CPUs.
+        output_format: str
+            'csv', or 'parquet' / 'arrow' for columnar files that 'load_processed' reads back directly.
+        statistics: bool
+            Whether to also write the descriptive statistics of each processed file, and the
+            forecast errors of its forecast/actual column pairs.
+        incremental: bool
+            Whether to update existing outputs with only the rows added to each export since the
+            previous run (see 'update_incremental'); needs 'parquet' or 'arrow' output.
+        **options:
+            Keyword arguments passed on to 'process_file'.
+
+    Returns:
+        dict: The output path for every input file that succeeded.
+        dict: The error for every input file that failed.
+    """
+    if incremental and output_format == "csv":
+        raise ValueError("Incremental updates need 'parquet' or 'arrow' output.")
+    os.makedirs(output_dir, exist_ok=True)
+    outputs, errors = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_process_and_write, path, output_dir, output_format, statistics, incremental, options): path for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                outputs[path] = future.result()
+            except Exception as error:
+                errors[path] = error
+    return outputs, errors
+
+
+def main(argv=None):
+    """
+    Command-line entry point: `python -m subs.pipeline INPUT [INPUT ...] --output DIR`.
+    """
+    parser = argparse.ArgumentParser(description="Clean and resample ENTSO-E exports in batch.")
+    parser.add_argument("inputs", nargs="+", help="Export files, directories or glob patterns.")
+    parser.add_argument("-o", "--output", required=True, help="Directory for the processed files.")
+    parser.add_argument("--time-column", default=None, help="Time column name (default: first column).")
+    parser.add_argument("--missing-values", default="Interpolate", choices=MISSING_VALUE_OPTIONS)
+    parser.add_argument("--max-gap", type=int, default=None, help="Longest gap in rows to fill.")
+    parser.add_argument("--resolution", type=int, default=15, help="Target time resolution number.")
+    parser.add_argument("--unit", default="minutes", choices=["minutes", "hours"])
+    parser.add_argument("--aggregation", default="mean", choices=["mean", "sum", "min", "max"])
+    parser.add_argument("--format", default="csv", choices=sorted(OUTPUT_EXTENSIONS), help="Output file format.")
+    parser.add_argument("--statistics", action="store_true", help="Also write descriptive statistics and forecast errors.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only process rows added since the previous run of the same exports (parquet/arrow only).",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes.")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("No export files matched the given inputs.")
+    if args.incremental and args.format == "csv":
+        parser.error("--incremental needs --format parquet or --format arrow.")
+
+    outputs, errors = process_files(
+        paths, args.output, workers=args.workers, output_format=args.format, statistics=args.statistics,
+        incremental=args.incremental,
+        time_column=args.time_column, missing_values=args.missing_values, max_gap=args.max_gap,
+        time_resolution_number=args.resolution, time_resolution_unit=args.unit, aggregation=args.aggregation,
+    )
+    for path, output_path in sorted(outputs.items()):
+        print(f"{path} -> {output_path}")
+    for path, error in sorted(errors.items()):
+        print(f"{path}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
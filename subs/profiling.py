@@ -0,0 +1,249 @@
+# profiling.py
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+import pandas as pd
+
+logger = logging.getLogger("entsoe.performance")
+# Level name (e.g. "INFO") at which the records are written to stderr; unset leaves logging as configured
+PERFORMANCE_LOG_LEVEL = os.environ.get("ENTSOE_PERFORMANCE_LOG")
+
+# Number of recent stage records kept for the whole process
+RECENT_RECORDS = 1000
+
+_local = threading.local()
+_lock = threading.Lock()
+_recent = deque(maxlen=RECENT_RECORDS)
+_totals = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "cache_hits": 0, "cache_misses": 0})
+
+
+def _rows(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def _bytes(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    return None
+
+
+def configure_logging(level=PERFORMANCE_LOG_LEVEL):
+    """
+    Writes the records of the 'entsoe.performance' logger to stderr at the given level.
+
+    Python loggers drop INFO records unless the application configures a handler, so the JSON
+    records are silent by default. This adds one stream handler (only once, so module reloads
+    do not duplicate it) and stops the records from also reaching the root logger's handlers.
+    It runs at import with the ENTSOE_PERFORMANCE_LOG environment variable.
+
+    Args:
+        level: str or None
+            A logging level name such as 'INFO' or 'DEBUG'; None leaves the logger unchanged.
+    """
+    if not level:
+        return
+    logger.setLevel(level.upper())
+    if not any(getattr(handler, "_entsoe_performance", False) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        handler._entsoe_performance = True
+        logger.addHandler(handler)
+    logger.propagate = False
+
+
+def _run_records():
+    if not hasattr(_local, "records"):
+        _local.records = []
+    return _local.records
+
+
+def start_run(track_memory=False):
+    """
+    Starts a new set of records for the current thread, e.g. at the top of each Streamlit rerun.
+
+    Args:
+        track_memory: bool
+            Whether to also measure the peak memory of each stage in this run (slower, uses tracemalloc).
+            tracemalloc is process-wide: the peak includes allocations made meanwhile by other
+            sessions and background jobs, and a stage that starts while another one is being
+            measured is not measured itself.
+    """
+    _local.records = []
+    _local.track_memory = track_memory
+
+
+def tracks_memory():
+    """
+    Returns whether the current thread's run measures the peak memory of its stages.
+    """
+    return getattr(_local, "track_memory", False)
+
+
+def add_run_records(records):
+    """
+    Adds records made in another thread, e.g. by a background job, to the current thread's run.
+
+    The records are already in the process-wide totals, so they are not counted again.
+
+    Args:
+        records: list of dict
+            The records, as returned by 'get_run_records(as_list=True)'.
+    """
+    _run_records().extend(records)
+
+
+def set_stage_listener(listener):
+    """
+    Sets a function that is called as listener(stage, entering) when every profiled call in the
+    current thread starts and ends, e.g. to report the progress of a background job.
+
+    Args:
+        listener: callable or None
+            The function to call; None removes the listener. It may raise on entering to
+            stop the stage before it runs.
+    """
+    _local.stage_listener = listener
+
+
+def get_thread_context():
+    """
+    Returns the current thread's run records, memory tracking flag and stage listener, so that
+    helper threads can be set up with 'set_thread_context' to report into the same run.
+    """
+    return {
+        "records": _run_records(),
+        "track_memory": tracks_memory(),
+        "stage_listener": getattr(_local, "stage_listener", None),
+    }
+
+
+def set_thread_context(context):
+    """
+    Makes the current thread record into the run of another thread (see 'get_thread_context').
+
+    The records list is shared, not copied, so calls made here appear in that run's records.
+
+    Args:
+        context: dict
+            The context returned by 'get_thread_context'.
+    """
+    _local.records = context["records"]
+    _local.track_memory = context["track_memory"]
+    _local.stage_listener = context["stage_listener"]
+
+
+def get_run_records(as_list=False):
+    """
+    Returns the records of the current thread's run as a DataFrame, one row per stage call,
+    or as a list of dicts if 'as_list' is set.
+    """
+    if as_list:
+        return list(_run_records())
+    return pd.DataFrame(_run_records())
+
+
+def get_stage_totals():
+    """
+    Returns process-wide totals per stage: calls, seconds, cache hits and cache misses.
+    """
+    with _lock:
+        return pd.DataFrame.from_dict({stage: dict(total) for stage, total in _totals.items()}, orient="index")
+
+
+def get_recent_records():
+    """
+    Returns the most recent stage records of all sessions in this process.
+    """
+    with _lock:
+        return pd.DataFrame(list(_recent))
+
+
+def _publish(record):
+    _run_records().append(record)
+    with _lock:
+        _recent.append(record)
+        total = _totals[record["stage"]]
+        if record["event"] == "call":
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+        elif record["cache_hit"]:
+            total["cache_hits"] += 1
+        else:
+            total["cache_misses"] += 1
+    # The logger is off unless configured; skip the JSON encoding then, as this runs on every call
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record, default=str))
+
+
+def record_cache(stage, hit):
+    """
+    Records whether a cached pipeline stage was served from the cache.
+
+    Args:
+        stage: str
+            The name of the stage.
+        hit: bool
+            True for a cache hit, False for a miss.
+    """
+    _publish({"event": "cache", "stage": stage, "cache_hit": hit, "timestamp": time.time()})
+
+
+def profiled(func):
+    """
+    Decorator that records the wall time, rows in and out, and output size of every call.
+
+    When the current run tracks memory (see 'start_run'), the peak memory allocated during the
+    call is recorded as well; it is the process-wide peak, so it is only exact while no other
+    stage runs, as in the benchmarks. Records go to the current run (for the sidebar performance panel),
+    the process-wide totals and the 'entsoe.performance' logger as JSON.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        listener = getattr(_local, "stage_listener", None)
+        if listener is not None:
+            listener(func.__name__, True)
+        measure_memory = getattr(_local, "track_memory", False) and not tracemalloc.is_tracing()
+        if measure_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = None
+            if measure_memory:
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if listener is not None:
+                listener(func.__name__, False)
+
+        rows_in = next((_rows(arg) for arg in args if _rows(arg) is not None), None)
+        _publish({
+            "event": "call",
+            "stage": func.__name__,
+            "seconds": seconds,
+            "rows_in": rows_in,
+            "rows_out": _rows(result),
+            "bytes_out": _bytes(result),
+            "peak_bytes": peak_bytes,
+            "timestamp": time.time(),
+        })
+        return result
+    return wrapper
+
+
+configure_logging()
@@ -0,0 +1,208 @@
+# rollup.py
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.data_loader import SOURCE_TIMEZONE, infer_native_frequency, prepare_time_index, resample_bins
+
+# The levels of the pyramid, finest first; each one is rolled up from the level it names
+ROLLUP_LEVELS = {"hour": None, "day": "hour", "week": "day", "month": "day"}
+# How the statistics of finer bins combine into a coarser bin, and their value for an empty bin
+STATISTICS = {"sum": (np.add, 0.0), "count": (np.add, 0), "min": (np.fmin, np.nan), "max": (np.fmax, np.nan)}
+# Bin labels of the calendar levels, computed on naive local times
+CALENDAR_FREQUENCIES = {"day": "D", "week": "7D", "month": "MS"}
+
+
+def _calendar_labels(index, level):
+    # The local calendar bin that every timestamp falls in. Labels are built on wall-clock
+    # times and localized again, so days, weeks and months keep their local midnight over DST
+    naive = index.tz_localize(None) if index.tz is not None else index
+    if level == "day":
+        labels = naive.normalize()
+    elif level == "week":
+        labels = naive.normalize() - pd.to_timedelta(naive.weekday, unit="D")
+    else:
+        labels = naive.to_period("M").to_timestamp()
+    bins = pd.date_range(labels[0], labels[-1], freq=CALENDAR_FREQUENCIES[level])
+    if index.tz is not None:
+        labels, bins = labels.tz_localize(index.tz), bins.tz_localize(index.tz)
+    return labels, bins
+
+
+def _roll_up(statistics, positions, bin_count):
+    """
+    Combines the statistics of sorted rows into the bins at their (non-decreasing) positions.
+
+    Every run of rows in the same bin is reduced with one 'ufunc.reduceat' call per
+    statistic, then written into arrays covering every bin, so bins without rows are present
+    too (with a sum and count of zero and a missing minimum and maximum).
+
+    Returns:
+        dict: The 'sum', 'count', 'min' and 'max' arrays, one row per bin.
+    """
+    starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+    level = {}
+    for statistic, (combine, empty) in STATISTICS.items():
+        reduced = combine.reduceat(statistics[statistic], starts, axis=0)
+        values = np.full((bin_count, reduced.shape[1]), empty, dtype=reduced.dtype)
+        values[positions[starts]] = reduced
+        values.flags.writeable = False
+        level[statistic] = values
+    return level
+
+
+class RollupPyramid:
+    """
+    Precomputed sums, counts, minima and maxima of a time series at hourly, daily, weekly and
+    monthly resolution.
+
+    The hourly level is rolled up from the native rows, the daily level from the hourly one and
+    the weekly and monthly levels from the daily one (weeks do not nest in months), so building
+    the whole pyramid reads the native data once. Hours are UTC bins; days, weeks (starting on
+    Monday) and months follow the local calendar, like the bins of 'resample_frame' and the
+    Trend Analysis page. Every level covers each bin from the first to the last, empty ones
+    included. The arrays are read-only, so a pyramid is shared as is through the frame cache.
+    """
+
+    def __init__(self, levels, columns, index_name, native_frequency, dtype):
+        self.levels = levels
+        self.columns = pd.Index(columns)
+        self.index_name = index_name
+        self.native_frequency = native_frequency
+        self.dtype = dtype
+
+    def __sizeof__(self):
+        # Lets the frame cache account for the arrays rather than the Python object
+        return sum(
+            values.nbytes for index, level in self.levels.values() for values in level.values()
+        )
+
+    def level(self, name, statistic="mean"):
+        """
+        Returns one statistic of one level as a DataFrame.
+
+        Args:
+            name: str
+                The level, one of 'hour', 'day', 'week' or 'month'.
+            statistic: str
+                'mean', 'sum', 'count', 'min' or 'max'. The mean is the sum divided by the count,
+                missing for bins without values.
+
+        Returns:
+            pandas DataFrame: The statistic of every bin, indexed by the start of the bin (UTC
+            for hours, local time for the calendar levels).
+        """
+        index, level = self.levels[name]
+        if statistic == "mean":
+            values = _mean(level["sum"], level["count"])
+        else:
+            values = level[statistic].copy()
+        return pd.DataFrame(values, index=index.copy(), columns=self.columns, copy=False)
+
+    def resample(self, target_frequency, aggregation="mean", origin=None):
+        """
+        Downsamples to a whole number of hours from the pyramid, as 'resample_frame' would.
+
+        The bins are those of 'resample_frame' (see 'resample_bins'), aligned to local midnight.
+        Each one combines the hourly bins it holds, or the daily bins for targets of whole local
+        days, so a change of resolution costs a pass over a level instead of the native rows.
+        The results only differ from resampling the native rows by the rounding of the sums.
+
+        Args:
+            target_frequency: pandas Timedelta
+                The target time resolution.
+            aggregation: str or dict
+                'mean', 'sum', 'min' or 'max', for all columns or per column.
+            origin: pandas Timestamp or None
+                The local midnight the bins are counted from; defaults to the one of the first row.
+
+        Returns:
+            pandas DataFrame or None: The resampled DataFrame, or None if the target is not a
+            whole number of hours coarser than the native resolution, the origin is not on a
+            whole hour (or there is no data); the native rows have to be resampled then.
+        """
+        target_frequency = pd.Timedelta(target_frequency)
+        hour = pd.Timedelta(hours=1)
+        index, level = self.levels["hour"]
+        if not len(index) or target_frequency % hour or not target_frequency > self.native_frequency:
+            return None
+        if origin is not None and pd.Timestamp(origin).value % hour.value:
+            return None
+
+        methods = aggregation if isinstance(aggregation, dict) else dict.fromkeys(self.columns, aggregation)
+        bins, fixed_width = resample_bins(index[0], index[-1], target_frequency, origin)
+        if not fixed_width and target_frequency >= pd.Timedelta(days=1):
+            index, level = self.levels["day"]
+        positions = np.searchsorted(bins.asi8, index.asi8, side="right") - 1
+        blocks = _roll_up(level, positions, len(bins))
+        bin_count = len(bins)
+
+        reduced = np.empty((bin_count, len(self.columns)), dtype=self.dtype)
+        for position, column in enumerate(self.columns):
+            method = methods[column]
+            if method == "mean":
+                reduced[:, position] = _mean(blocks["sum"][:, position], blocks["count"][:, position])
+            elif method in ("sum", "min", "max"):
+                reduced[:, position] = blocks[method][:, position]
+            else:
+                raise ValueError(f"Unknown aggregation method: {method}")
+
+        return pd.DataFrame(reduced, index=bins.rename(self.index_name), columns=self.columns, copy=False)
+
+
+def _mean(sums, counts):
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+
+
+@profiled
+def build_rollups(df_read, time_column=None, skip_invalid_row="True", first_invalid_row_time=np.nan,
+                  timezone=SOURCE_TIMEZONE):
+    """
+    Builds the rollup pyramid (see 'RollupPyramid') of a time series.
+
+    Args:
+        df_read: pandas DataFrame
+            The data, indexed by time, or with its time in 'time_column'.
+        time_column: str or None
+            The column with the times of cleaned, not yet resampled data; it is then indexed,
+            sorted, deduplicated and trimmed as 'process_time_resolution_and_duplicates' does.
+            None if 'df_read' is already indexed by time.
+        skip_invalid_row: str
+            Flag from the loading stage indicating whether to keep the rows from the first invalid row on.
+        first_invalid_row_time: datetime or np.nan
+            The time of the first invalid row, used to trim the data.
+        timezone: str
+            The timezone of the calendar levels.
+
+    Returns:
+        RollupPyramid: The pyramid, built from the native rows through each level in turn.
+    """
+    if time_column is not None:
+        df_read = prepare_time_index(df_read, time_column, skip_invalid_row, first_invalid_row_time)
+    elif not df_read.index.is_monotonic_increasing:
+        df_read = df_read.sort_index(kind="stable")
+
+    dtype = np.result_type(np.float32, *df_read.dtypes)
+    values = df_read.to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+    statistics = {"sum": np.where(present, values, 0.0), "count": present.astype(np.int64), "min": values, "max": values}
+
+    index = df_read.index
+    levels = {}
+    if len(index):
+        labels = index.floor("h")
+        hours = pd.date_range(labels[0], labels[-1], freq="h", name=index.name)
+        levels["hour"] = (hours, _roll_up(statistics, np.searchsorted(hours.asi8, labels.asi8), len(hours)))
+        local_hours = hours.tz_convert(timezone) if hours.tz is not None else hours
+        for name, parent in ROLLUP_LEVELS.items():
+            if parent is None:
+                continue
+            parent_index, parent_level = levels[parent]
+            parent_index = local_hours if parent == "hour" else parent_index
+            labels, bins = _calendar_labels(parent_index, name)
+            positions = np.searchsorted(bins.asi8, labels.asi8)
+            levels[name] = (bins.rename(index.name), _roll_up(parent_level, positions, len(bins)))
+    else:
+        empty = {statistic: np.empty((0, values.shape[1])) for statistic in STATISTICS}
+        levels = {name: (index[:0], empty) for name in ROLLUP_LEVELS}
+    return RollupPyramid(levels, df_read.columns, index.name, infer_native_frequency(index), dtype)
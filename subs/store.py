@@ -0,0 +1,153 @@
+# store.py
+import datetime
+import sys
+
+import numpy as np
+import pandas as pd
+
+from subs.profiling import profiled
+from subs.data_loader import SOURCE_TIMEZONE
+
+
+class TimeSeriesStore:
+    """
+    An immutable, time-sorted copy of a processed DataFrame for fast date-range lookups.
+
+    The timestamps are kept as one sorted int64 array (UTC nanoseconds) and the values as one
+    row-major 2-D array, both read-only. A range lookup is two binary searches, and the frames
+    it returns are views on these arrays, so looking at a week of a multi-year series costs the
+    same as looking at a week of a single year. Because nothing can modify it, the store is
+    shared as is (without copies) between reruns and sessions through the frame cache.
+    """
+
+    def __init__(self, times, values, columns, index_name=None):
+        self._times = np.asarray(times, dtype=np.int64)
+        self._values = np.ascontiguousarray(values)
+        if self._values.ndim != 2 or len(self._values) != len(self._times):
+            raise ValueError("'values' needs one row per timestamp.")
+        self._times.flags.writeable = False
+        self._values.flags.writeable = False
+        self.columns = pd.Index(columns)
+        self.index_name = index_name
+
+    @classmethod
+    @profiled
+    def from_frame(cls, df_read):
+        """
+        Builds a store from a processed DataFrame with a datetime index.
+
+        Args:
+            df_read: pandas DataFrame
+                The processed DataFrame, indexed by UTC (or naive) time.
+
+        Returns:
+            TimeSeriesStore: The store, sorted by time with duplicate timestamps removed, with
+            float32 values if that is lossless.
+        """
+        index = df_read.index
+        if index.tz is not None:
+            index = index.tz_convert("UTC")
+        values = df_read.to_numpy(dtype=np.result_type(np.float32, *df_read.dtypes))
+        if values.dtype == np.float64:
+            # Decoded compact frames hold float32 or whole values: keep them at half the size
+            # whenever float32 represents every value exactly
+            narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed, values, equal_nan=True):
+                values = narrowed
+        times = index.asi8.copy()
+        if not index.is_monotonic_increasing:
+            order = np.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+        if len(times) > 1 and not (np.diff(times) > 0).all():
+            keep = np.r_[True, np.diff(times) > 0]
+            times, values = times[keep], values[keep]
+        return cls(times, values, df_read.columns, index.name)
+
+    def __len__(self):
+        return len(self._times)
+
+    def __sizeof__(self):
+        # Lets the frame cache account for the arrays rather than the Python object
+        return self._times.nbytes + self._values.nbytes + sys.getsizeof(self.columns)
+
+    @property
+    def first(self):
+        """The first timestamp (UTC), or None if the store is empty."""
+        return pd.Timestamp(self._times[0], tz="UTC") if len(self) else None
+
+    @property
+    def last(self):
+        """The last timestamp (UTC), or None if the store is empty."""
+        return pd.Timestamp(self._times[-1], tz="UTC") if len(self) else None
+
+    def positions(self, start=None, end=None):
+        """
+        Finds the rows in [start, end) with two binary searches.
+
+        Args:
+            start: timestamp or None
+                The first time to include; naive times are taken as UTC. None starts at the first row.
+            end: timestamp or None
+                The first time to exclude; naive times are taken as UTC. None ends after the last row.
+
+        Returns:
+            int, int: The first row and the row after the last one.
+        """
+        first = 0 if start is None else int(np.searchsorted(self._times, _utc_value(start), side="left"))
+        stop = len(self) if end is None else int(np.searchsorted(self._times, _utc_value(end), side="left"))
+        return first, max(first, stop)
+
+    def frame(self, first=0, stop=None, timezone=None):
+        """
+        Returns rows [first, stop) as a DataFrame whose values and index are views on the store.
+
+        Args:
+            first: int
+                The first row.
+            stop: int or None
+                The row after the last one; None means the end of the store.
+            timezone: str or None
+                The timezone of the returned index; None keeps UTC.
+
+        Returns:
+            pandas DataFrame: The read-only rows, indexed by time.
+        """
+        stop = len(self) if stop is None else stop
+        index = pd.DatetimeIndex(self._times[first:stop].view("datetime64[ns]"), name=self.index_name)
+        index = index.tz_localize("UTC")
+        if timezone is not None:
+            index = index.tz_convert(timezone)
+        return pd.DataFrame(self._values[first:stop], index=index, columns=self.columns, copy=False)
+
+    def slice(self, start=None, end=None, timezone=None):
+        """
+        Returns the rows in [start, end) as a DataFrame of views (see 'positions' and 'frame').
+        """
+        return self.frame(*self.positions(start, end), timezone=timezone)
+
+    def date_range(self, first_date, last_date, timezone=SOURCE_TIMEZONE):
+        """
+        Returns every row of the local calendar days 'first_date' to 'last_date', both included.
+
+        Args:
+            first_date: datetime.date
+                The first day.
+            last_date: datetime.date
+                The last day.
+            timezone: str
+                The timezone of the calendar days and of the returned index.
+
+        Returns:
+            pandas DataFrame: The rows of those days, indexed in local time.
+        """
+        start = pd.Timestamp(first_date).tz_localize(timezone)
+        end = pd.Timestamp(last_date + datetime.timedelta(days=1)).tz_localize(timezone)
+        return self.slice(start, end, timezone)
+
+
+def _utc_value(time):
+    # Nanoseconds since the epoch in UTC, comparable with the store's timestamps
+    time = pd.Timestamp(time)
+    if time.tz is None:
+        time = time.tz_localize("UTC")
+    return time.tz_convert("UTC").value
@@ -6,8 +6,73 @@ import streamlit as st
 import datetime
 import plotly.graph_objects as go
 import random
+from subs.profiling import profiled
+from subs.data_loader import compute_column_statistics
+from subs.aggregation import compute_trend_aggregates
+from subs.decimation import decimate_series, DEFAULT_MAX_POINTS
+from subs.store import TimeSeriesStore
+from subs.forecast_errors import compute_forecast_errors, PROFILES
 
+# Above this many points a trace is drawn with WebGL instead of SVG
+WEBGL_POINT_THRESHOLD = 5000
+# Page sizes offered for tables; only the visible page is sent to the browser
+TABLE_PAGE_SIZES = [100, 500, 2000]
 
+
+def time_series_trace(series, name, max_points=DEFAULT_MAX_POINTS, method="minmax", **trace_options):
+    """
+    Creates a line trace for a time series, reduced to about 'max_points' points.
+
+    The reduction keeps the payload sent to the browser roughly constant whatever the length of
+    the series. Traces that stay large (e.g. when every point is requested) use WebGL rendering.
+
+    Args:
+        series: pandas Series
+            The series to plot, indexed by time.
+        name: str
+            The name of the trace.
+        max_points: int or None
+            The approximate number of points to draw; None draws every point.
+        method: str
+            The decimation method, 'minmax' or 'lttb' (see 'decimate_series').
+        **trace_options:
+            Further options passed to the Plotly trace.
+
+    Returns:
+        plotly trace: A 'go.Scatter' or 'go.Scattergl' trace.
+    """
+    series = decimate_series(series, max_points, method)
+    trace_type = go.Scattergl if len(series) > WEBGL_POINT_THRESHOLD else go.Scatter
+    return trace_type(x=series.index, y=series.values, name=name, **trace_options)
+
+
+def display_paginated_table(df, key):
+    """
+    Displays a DataFrame one page at a time.
+
+    Only the rows of the selected page are serialised and sent to the browser, so showing a
+    multi-year table costs the same as showing a few hundred rows.
+
+    Args:
+        df: pandas DataFrame
+            The DataFrame to display.
+        key: str
+            A unique prefix for the page widgets of this table.
+    """
+    page_size_column, page_column, info_column = st.columns(3)
+    with page_size_column:
+        page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max(-(-len(df) // page_size), 1)
+    with page_column:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{key}_page")
+    with info_column:
+        st.caption(f"{len(df):,} rows, {page_count:,} pages")
+
+    first = (min(page, page_count) - 1) * page_size
+    st.dataframe(df.iloc[first:first + page_size])
+
+
+@profiled
 def visualize_missing_values(df):
     """
     Creates and displays a bar chart visualisation of missing values in each column of a DataFrame.
@@ -49,45 +114,49 @@ def visualize_missing_values(df):
         # Display the chart in Streamlit
         st.write(fig)
 
-def visualize_data_by_date_range(df_read, date_of_interest):
+@profiled
+def visualize_data_by_date_range(df_read, date_of_interest, max_points=DEFAULT_MAX_POINTS, method="minmax"):
     """
     Visualizes data in the DataFrame for a specified date range.
 
     This function filters the DataFrame for the provided date range and creates a line plot for 
     each column in the filtered DataFrame using Plotly. The visualization is displayed in the 
-    Streamlit app.
+    Streamlit app. The range is looked up with a binary search in a 'TimeSeriesStore' and the
+    table is shown one page at a time, so the cost does not grow with the length of the data.
 
     Args:
-        df_read: pandas DataFrame
-            The DataFrame containing the data to be visualized.
+        df_read: TimeSeriesStore or pandas DataFrame
+            The data to be visualized; a DataFrame is first copied into a store.
         date_of_interest: list of datetime.date
-            A list containing the start and end dates for filtering the DataFrame.
+            A list containing the start and end dates (local time) for filtering the data. While
+            only the start date is picked, that single day is shown.
+        max_points: int or None
+            The approximate number of points drawn per column; None draws every point. Narrowing
+            the date range shows the data in more detail, down to full resolution.
+        method: str
+            The decimation method, 'minmax' (keeps peaks) or 'lttb'.
 
     Displays:
         Line plots for each column in the DataFrame over the specified date range.
     """
 
-    # Filter the DataFrame for the selected date range
-    df_day_of_interest = df_read.loc[
-        date_of_interest[0].strftime("%Y-%m-%d") : date_of_interest[1].strftime("%Y-%m-%d")
-    ]
+    # Filter the data for the selected date range (dates are in local time)
+    store = df_read if isinstance(df_read, TimeSeriesStore) else TimeSeriesStore.from_frame(df_read)
+    df_day_of_interest = store.date_range(date_of_interest[0], date_of_interest[-1])
 
     # Display the filtered DataFrame
-    st.dataframe(df_day_of_interest)
+    display_paginated_table(df_day_of_interest, "date_range_table")
 
     # Create a line plot for each column in the DataFrame
     fig2 = go.Figure()
     for column in df_day_of_interest.columns:
-        fig2.add_trace(
-            go.Scatter(
-                x=df_day_of_interest.index, y=df_day_of_interest[column], name=column
-            )
-        )
+        fig2.add_trace(time_series_trace(df_day_of_interest[column], column, max_points, method))
 
     # Display the figure in Streamlit
     st.plotly_chart(fig2,use_container_width=True)
 
-def visualise_time_series_data(df_read):
+@profiled
+def visualise_time_series_data(df_read, aggregates=None):
     """
     Visualizes time series data in the DataFrame by creating line plots for daily mean values,
     bar charts for monthly peak values, and bar charts for monthly changes.
@@ -99,11 +168,16 @@ def visualise_time_series_data(df_read):
     Args:
         df_read: pandas DataFrame
             The DataFrame containing time series data.
+        aggregates: dict
+            Precomputed output of 'compute_trend_aggregates'; computed from 'df_read' if omitted.
 
     Displays:
         Three figures - one for daily means, one for monthly peaks, and one for monthly changes.
     """
 
+    if aggregates is None:
+        aggregates = compute_trend_aggregates(df_read)
+
     fig3 = go.Figure()
     fig4 = go.Figure()
     fig5 = go.Figure()
@@ -112,16 +186,13 @@ def visualise_time_series_data(df_read):
         # Generate a random color
         random_color = 'rgb(%d, %d, %d)' % (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
-        # Resample and calculate mean for each day
-        daily_mean = df_read[column].resample('D').mean()
-
-        # Resample for monthly peak and mean
-        monthly_peak = df_read[column].resample('M').max()
-        monthly_mean = df_read[column].resample('M').sum()
-        monthly_change = monthly_mean.diff()
+        # Daily mean, monthly peak and monthly total come from the shared aggregation stage
+        daily_mean = aggregates["daily_mean"][column]
+        monthly_peak = aggregates["monthly_max"][column]
+        monthly_change = aggregates["monthly_sum"][column].diff()
 
         # Add traces for daily mean, monthly peak, and monthly change
-        fig3.add_trace(go.Scatter(x=daily_mean.index, y=daily_mean, name=column, line=dict(color=random_color)))
+        fig3.add_trace(time_series_trace(daily_mean, column, line=dict(color=random_color)))
         fig4.add_trace(go.Bar(x=monthly_peak.index.strftime('%B'), y=monthly_peak, name=column, marker_color=random_color))
         fig5.add_trace(go.Bar(x=monthly_change.index, y=monthly_change, name=f'Monthly Change - {column}', marker_color=random_color))
 
@@ -133,4 +204,83 @@ def visualise_time_series_data(df_read):
     # Display the figures in Streamlit
     st.plotly_chart(fig3,use_container_width=True)
     st.plotly_chart(fig4,use_container_width=True)
-    st.plotly_chart(fig5,use_container_width=True)    
\ No newline at end of file
+    st.plotly_chart(fig5,use_container_width=True)
+
+
+@profiled
+def visualise_forecast_errors(df_read, errors=None):
+    """
+    Displays forecast accuracy for every forecast/actual column pair: a summary table and the
+    MAE and bias by hour of day, weekday or month.
+
+    Args:
+        df_read: pandas DataFrame
+            The processed DataFrame indexed by time.
+        errors: dict
+            Precomputed output of 'compute_forecast_errors'; computed from 'df_read' if omitted.
+
+    Displays:
+        Nothing if the columns hold no forecast/actual pairs.
+    """
+
+    if errors is None:
+        errors = compute_forecast_errors(df_read)
+    if not errors["pairs"]:
+        return
+
+    st.markdown("### 🎯 Forecast Accuracy")
+    st.markdown("Errors are forecast minus actual: a positive bias means the forecast was too high. MAPE is in %.")
+    st.dataframe(errors["summary"].round(2))
+
+    profile_name = st.selectbox("Show the forecast error by:", list(PROFILES))
+    profile = errors[profile_name]
+
+    fig6 = go.Figure()
+    for label in profile.index.get_level_values("pair").unique():
+        pair_profile = profile.loc[label]
+        fig6.add_trace(go.Scatter(x=pair_profile.index, y=pair_profile["MAE"], name=f"MAE - {label}", mode="lines+markers"))
+        fig6.add_trace(go.Scatter(x=pair_profile.index, y=pair_profile["bias"], name=f"Bias - {label}", line=dict(dash="dot")))
+    fig6.update_layout(title=f"Forecast Error by {profile_name.capitalize()}", xaxis_title=profile_name.capitalize(), yaxis_title='Error')
+
+    st.plotly_chart(fig6,use_container_width=True)
+    st.dataframe(profile.round(2))
+
+
+@profiled
+def display_column_statistics(df_read, stats=None):
+    """
+    Computes and displays descriptive statistics for each column in the DataFrame.
+
+    This function calculates descriptive statistics such as count, mean, standard deviation, minimum,
+    percentiles, and maximum for each column. It then formats these statistics into a markdown string
+    for better readability and displays them using Streamlit.
+
+    Args:
+        df_read: pandas DataFrame
+            The DataFrame for which descriptive statistics are to be computed and displayed.
+        stats: pandas DataFrame
+            Precomputed output of 'compute_column_statistics'; computed from 'df_read' if omitted.
+    """
+
+    if stats is None:
+        stats = compute_column_statistics(df_read)
+
+    for column in df_read.columns:
+        # Descriptive statistics for the current column
+        column_stats = stats[column]
+
+        # Construct the summary text with markdown formatting
+        summary_text = f"""
+        ### Statistics for {column}
+        **Count**: {column_stats['count']} data points.\n
+        **Mean**: The average is {column_stats['mean']:.2f}.\n
+        **Standard Deviation**: The standard deviation is {column_stats['std']:.2f}, which indicates variability.\n
+        **Minimum**: The smallest observed value is {column_stats['min']:.2f}.\n
+        **25th Percentile**: 25% of the values are {column_stats['25%']:.2f} or less.\n
+        **50th Percentile (Median)**: The median value is {column_stats['50%']:.2f}.\n
+        **75th Percentile**: 75% of the values are {column_stats['75%']:.2f} or less.\n
+        **Maximum**: The largest observed value is {column_stats['max']:.2f}.
+        """
+
+        # Display the summary using Streamlit's markdown function
+        st.markdown(summary_text)
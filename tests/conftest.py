@@ -0,0 +1,21 @@
+# conftest.py
+import os
+
+import pandas as pd
+import pytest
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data-for-tests")
+# A complete year of 15-minute data, with the skipped spring hour and the repeated autumn hour
+EXPORT_2023 = os.path.join(FIXTURE_DIR, "Total Load - Day Ahead _ Actual_202301010000-202401010000.csv")
+
+
+@pytest.fixture(scope="session")
+def export_2023():
+    """The path of the bundled 2023 export."""
+    return EXPORT_2023
+
+
+@pytest.fixture(scope="session")
+def export_2023_rows():
+    """The rows of the bundled 2023 export as strings, as they appear in the file."""
+    return pd.read_csv(EXPORT_2023, dtype=str)
@@ -0,0 +1,148 @@
+# test_data_loader.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from subs.data_loader import (
+    load_data,
+    load_data_streaming,
+    process_data_for_analysis,
+    convert_time,
+    process_uploaded_file,
+    prepare_time_index,
+    parse_interval_timestamps,
+    localize_to_utc,
+    local_midnight,
+    resample_bins,
+    resample_frame,
+    SOURCE_TIMEZONE,
+)
+
+# 365 days of 96 quarter-hours: the skipped spring hour and the repeated autumn hour cancel out
+ROWS_2023 = 35040
+# Data rows of the repeated autumn hour (lines 28906-28913 of the file) and of the skipped spring hour
+AUTUMN_ROWS = slice(28904, 28912)
+SPRING_ROWS = slice(8072, 8076)
+
+
+def _converted_times(path):
+    # The UTC times of an export after loading, invalid-row handling and 'convert_time'
+    with open(path, "rb") as export_file:
+        df_read = load_data(export_file)
+    time_column = df_read.columns[0]
+    df_read, _, _ = process_data_for_analysis(df_read, time_column)
+    return pd.DatetimeIndex(convert_time(df_read, time_column)[time_column])
+
+
+def test_localize_to_utc_resolves_dst_hours(export_2023_rows):
+    time_column = export_2023_rows.columns[0]
+    utc_times = localize_to_utc(parse_interval_timestamps(export_2023_rows[time_column]))
+
+    # Both copies of 02:00-03:00 on 29 October, summer time first, are four distinct UTC hours
+    expected = pd.date_range("2023-10-29 00:00", periods=8, freq="15min", tz="UTC")
+    assert export_2023_rows[time_column].iloc[AUTUMN_ROWS].str.startswith("29.10.2023 02:").all()
+    assert (utc_times[AUTUMN_ROWS] == expected).all()
+    # 02:00-03:00 on 26 March does not exist
+    assert utc_times[SPRING_ROWS].isna().all()
+
+
+def test_convert_time_keeps_a_strictly_increasing_utc_index(export_2023):
+    times = _converted_times(export_2023)
+
+    assert len(times) == ROWS_2023
+    assert str(times.tz) == "UTC"
+    assert (np.diff(times.asi8) > 0).all()
+    # The repeated autumn hour keeps all eight rows
+    assert times.isin(pd.date_range("2023-10-29 00:00", periods=8, freq="15min", tz="UTC")).sum() == 8
+
+
+def test_streaming_loader_matches_convert_time(export_2023):
+    df_read, _, _ = load_data_streaming(export_2023)
+
+    assert pd.DatetimeIndex(df_read[df_read.columns[0]]).equals(_converted_times(export_2023))
+
+
+@pytest.mark.parametrize(
+    "cut, kept_rows",
+    [
+        # The first "-" falls in the skipped spring hour: the trim starts at 03:00 local time
+        (8073, 8072),
+        # The first "-" falls in the second copy of the repeated autumn hour: the rows before it stay
+        (28909, 28905),
+    ],
+)
+def test_first_invalid_row_over_dst_hours(export_2023_rows, tmp_path, cut, kept_rows):
+    download = export_2023_rows.copy()
+    download.iloc[cut:, 1:] = "-"
+    path = tmp_path / f"download_{cut}.csv"
+    download.to_csv(path, index=False)
+
+    with open(path, "rb") as export_file:
+        df_read = load_data(export_file)
+    time_column = df_read.columns[0]
+    df_read, skip_invalid_row, first_invalid_row_time = process_data_for_analysis(df_read, time_column)
+    cleaned, _ = process_uploaded_file(convert_time(df_read, time_column), "Interpolate")
+    kept = prepare_time_index(cleaned, time_column, skip_invalid_row, first_invalid_row_time)
+
+    streamed, streamed_skip, streamed_time = load_data_streaming(str(path))
+    assert skip_invalid_row == streamed_skip == "False"
+    assert first_invalid_row_time == streamed_time
+    assert len(kept) == kept_rows
+
+
+@pytest.fixture(scope="module")
+def values_2023(export_2023):
+    """The 2023 export as float64 columns on its UTC index."""
+    df_read, _, _ = load_data_streaming(export_2023)
+    return df_read.set_index(df_read.columns[0]).astype(np.float64)
+
+
+def _assert_frames_match(result, expected):
+    assert result.index.equals(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(dtype=np.float64), rtol=1e-9)
+
+
+def test_resample_bins_follow_local_days_over_dst():
+    start = pd.Timestamp("2023-03-25 05:00", tz="UTC")
+    end = pd.Timestamp("2023-10-30 05:00", tz="UTC")
+    days, fixed_width = resample_bins(start, end, pd.Timedelta(days=1))
+
+    assert not fixed_width
+    assert days[0] == pd.Timestamp("2023-03-24 23:00", tz="UTC")
+    assert (days.tz_convert(SOURCE_TIMEZONE).hour == 0).all()
+    lengths = pd.Series(np.diff(days.asi8), index=days[:-1].tz_convert(SOURCE_TIMEZONE).date)
+    assert lengths[pd.Timestamp("2023-03-26").date()] == pd.Timedelta(hours=23).value
+    assert lengths[pd.Timestamp("2023-10-29").date()] == pd.Timedelta(hours=25).value
+
+    # Sub-day targets that divide a day restart at every local midnight
+    six_hours, _ = resample_bins(start, end, pd.Timedelta(hours=6))
+    assert set(six_hours.tz_convert(SOURCE_TIMEZONE).hour) == {0, 6, 12, 18}
+
+
+@pytest.mark.parametrize("aggregation", ["mean", "sum", "min", "max"])
+def test_daily_resampling_matches_local_calendar_days(values_2023, aggregation):
+    result = resample_frame(values_2023, pd.Timedelta(days=1), aggregation)
+    expected = values_2023.tz_convert(SOURCE_TIMEZONE).resample("D").agg(aggregation)
+    expected.index = expected.index.tz_convert("UTC")
+
+    _assert_frames_match(result, expected)
+    # The days of the DST changes hold 92 and 100 quarter-hours
+    counts = resample_frame(values_2023.notna().astype(np.float64), pd.Timedelta(days=1), "sum")
+    local_counts = counts.iloc[:, 1].rename(lambda time: time.tz_convert(SOURCE_TIMEZONE).date())
+    assert local_counts[pd.Timestamp("2023-03-26").date()] == 92
+    assert local_counts[pd.Timestamp("2023-10-29").date()] == 100
+
+
+@pytest.mark.parametrize("target", ["1h", "20min", "7h"])
+@pytest.mark.parametrize("aggregation", ["mean", "sum", "max"])
+def test_fixed_width_resampling_matches_pandas(values_2023, target, aggregation):
+    # Whole hours use the reshape path, 20 minutes (not a multiple of the native 15) and an
+    # irregular index use 'reduceat'; 7 hours does not divide a day, so its bins have a fixed
+    # width counted from the first local midnight
+    irregular = values_2023.drop(values_2023.index[1000:1003])
+    for df_read in (values_2023, irregular):
+        origin = local_midnight(df_read.index[0])
+        result = resample_frame(df_read, pd.Timedelta(target), aggregation)
+        expected = df_read.resample(target, origin=origin).agg(aggregation)
+
+        _assert_frames_match(result, expected)
@@ -0,0 +1,58 @@
+# test_incremental.py
+import numpy as np
+import pytest
+
+from subs.incremental import update_incremental
+from subs.pipeline import process_file
+
+# Rows at which the export is cut, in download order; 8075 and 28908 fall in the skipped
+# spring hour and the repeated autumn hour; the full export is published up to row 29628
+CUTS = [8075, 20000, 28908, 29600, 35044]
+
+
+def _write_download(rows, cut, path):
+    # An earlier download of the export: values from 'cut' on are not published yet ("-")
+    download = rows.copy()
+    download.iloc[cut:, 1:] = "-"
+    download.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(missing_values="Interpolate"),
+        dict(missing_values="Seasonal (Previous Week)"),
+        dict(missing_values="Backward/Forward Filling", time_resolution_number=1, time_resolution_unit="hours"),
+        dict(missing_values="Interpolate", time_resolution_number=24, time_resolution_unit="hours", aggregation="sum"),
+    ],
+)
+def test_update_incremental_matches_full_run(export_2023_rows, tmp_path, options):
+    output_path = str(tmp_path / "processed.parquet")
+    previous_cut = 0
+    for cut in CUTS:
+        download = _write_download(export_2023_rows, cut, tmp_path / f"download_{cut}.csv")
+        updated, new_rows = update_incremental(download, output_path, **options)
+        expected, _ = process_file(download, **options)
+
+        # Only the rows published since the previous download are processed
+        assert 0 < new_rows <= cut - previous_cut, cut
+        previous_cut = cut
+
+        assert updated.index.equals(expected.index), cut
+        assert list(updated.columns) == list(expected.columns)
+        np.testing.assert_allclose(
+            updated.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-5, err_msg=f"cut {cut}"
+        )
+
+
+def test_update_incremental_skips_unchanged_download(export_2023_rows, tmp_path):
+    output_path = str(tmp_path / "processed.parquet")
+    download = _write_download(export_2023_rows, 20000, tmp_path / "download.csv")
+    first, first_rows = update_incremental(download, output_path)
+    again, new_rows = update_incremental(download, output_path)
+
+    # The four placeholder rows of the skipped spring hour are not counted
+    assert first_rows == 20000 - 4
+    assert new_rows == 0
+    assert again.equals(first)